@@ -24,6 +24,10 @@ router = APIRouter(prefix="/assistant", tags=["AI Assistant"])
 enrollment_cache: Dict[str, Dict[str, Any]] = {}
 ENROLLMENT_TIMEOUT = 90  # seconds (1.5 minutes)
 
+# Keyword matchers for the enrollment flow (one scan per response)
+ENROLLMENT_CONFIRM_PATTERN = re.compile(r"yes|yeah|sure|ok")
+UNRECOGNIZED_FACE_PATTERN = re.compile(r"don't recognize|unrecognized")
+
 def _cleanup_expired_cache():
     """Remove expired enrollment cache entries"""
     current_time = datetime.utcnow()
@@ -100,7 +104,7 @@ async def ask_assistant(request: AssistantRequest):
             if cache_data["state"] == "awaiting_confirmation":
                 query_lower = request.query.lower().strip()
                 
-                if "yes" in query_lower or "yeah" in query_lower or "sure" in query_lower or "ok" in query_lower:
+                if ENROLLMENT_CONFIRM_PATTERN.search(query_lower):
                     # User confirmed enrollment - move to name collection
                     enrollment_cache[request.user_id]["state"] = "awaiting_name"
                     enrollment_cache[request.user_id]["timestamp"] = datetime.utcnow()
@@ -251,7 +255,7 @@ async def ask_assistant(request: AssistantRequest):
             result = await vision_service.recognize_face(image_data)
             
             # Check if face was not recognized (Unknown)
-            if "don't recognize" in result or "unrecognized" in result:
+            if UNRECOGNIZED_FACE_PATTERN.search(result):
                 # Cache the image and prompt for enrollment
                 enrollment_cache[request.user_id] = {
                     "image_base64": image_data,
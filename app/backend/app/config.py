@@ -35,6 +35,8 @@ class Settings(BaseSettings):
     # Performance
     MAX_IMAGE_SIZE_MB: int = 5
     MAX_CONCURRENT_JOBS: int = 10
+    EXTERNAL_API_MAX_CONCURRENCY: int = 8  # In-flight Vision/LibreTranslate calls per service
+    EXTERNAL_API_MAX_ATTEMPTS: int = 3  # Attempts on HTTP 429 / quota errors
     
     class Config:
         env_file = ".env"
@@ -1,6 +1,8 @@
 #  The Helper: Handling Images
 
+import asyncio
 import base64
+import functools
 import numpy as np
 import cv2 # You will need 'opencv-python' in your requirements.txt
 
@@ -24,4 +26,25 @@ def decode_image(base64_string: str):
         return image
     except Exception as e:
         print(f"Image Decode Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def retry_with_backoff(is_retryable, attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+    """
+    Retry an async function with exponential backoff (1s, 2s, 4s, ...).
+
+    Only exceptions for which is_retryable(exc) is true are retried;
+    anything else, or the last failed attempt, is re-raised.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == attempts - 1 or not is_retryable(e):
+                        raise
+                    await asyncio.sleep(min(base_delay * 2 ** attempt, max_delay))
+        return wrapper
+    return decorator
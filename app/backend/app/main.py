@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.v1 import  translation, faces, objects, assistant, camera, location
+from app.services.libre_service import close_shared_client
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -53,4 +54,5 @@ async def startup_event():
 async def shutdown_event():
     # Close database connections
     # Close Redis connection
+    await close_shared_client()
     print("👋 Shutting down gracefully")
\ No newline at end of file
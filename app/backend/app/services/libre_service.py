@@ -1,7 +1,70 @@
+import asyncio
+import hashlib
 import httpx
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from app.config import settings
 from app.core.exceptions import TranslationError
+from app.core.utils import retry_with_backoff
+
+try:
+    import cld3  # pycld3: in-process language detection
+    CLD3_AVAILABLE = True
+except ImportError:
+    CLD3_AVAILABLE = False
+    cld3 = None
+
+# Translations kept per process; the oldest entries are dropped first
+TRANSLATION_CACHE_SIZE = 4096
+
+# Language detection results kept per process, keyed by a hash of the text prefix
+DETECT_CACHE_SIZE = 1024
+DETECT_PREFIX_CHARS = 128
+
+# Shared by every service instance (one is built per request), like the client below.
+# (source, target, text) -> translation, so repeated strings skip the API
+_TRANSLATION_CACHE: Dict[Tuple[str, str, str], str] = {}
+# hash of text prefix -> language code, so repeated inputs skip /detect
+_DETECT_CACHE: Dict[bytes, str] = {}
+
+# Language codes the LibreTranslate server supports, fetched once from /languages
+_LANGUAGE_CODES: Optional[frozenset] = None
+_LANGUAGE_CODES_LOCK = asyncio.Lock()
+
+# Keep-alive client shared by every LibreTranslateService that isn't given one
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+
+# Caps in-flight /translate calls across all service instances so concurrent
+# requests don't trip the rate limit
+_TRANSLATE_SEM = asyncio.Semaphore(settings.EXTERNAL_API_MAX_CONCURRENCY)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        _SHARED_CLIENT = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+    return _SHARED_CLIENT
+
+
+async def close_shared_client():
+    """Close the shared HTTP client (call once, on shutdown)"""
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is not None:
+        await _SHARED_CLIENT.aclose()
+        _SHARED_CLIENT = None
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """True for LibreTranslate 429 / quota responses, which are worth retrying"""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return False
+    if error.response.status_code == 429:
+        return True
+    body = error.response.text.lower()
+    return "rate limit" in body or "quota" in body
 
 
 class LibreTranslateService:
@@ -11,14 +74,25 @@ class LibreTranslateService:
     Can be self-hosted or use public instance
     """
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            client: HTTP client to use; it is closed by close(). When None the
+                process-wide shared client is used and left open.
+        """
         self.base_url = settings.LIBRETRANSLATE_URL.rstrip('/')
         self.timeout = 15
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self._client = client
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The injected client, else the shared one (looked up per call, so it survives a restart)"""
+        return self._client if self._client is not None else get_client()
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close the HTTP client if it was passed in (the shared one stays open)"""
+        if self._client is not None:
+            await self._client.aclose()
     
     async def detect_language(self, text: str) -> str:
         """
@@ -30,22 +104,63 @@ class LibreTranslateService:
         Returns:
             Language code (e.g., 'en', 'es', 'fr')
         """
+        # The first few words are enough to identify the language
+        key = hashlib.blake2b(text[:DETECT_PREFIX_CHARS].encode(), digest_size=8).digest()
+        cached = _DETECT_CACHE.get(key)
+        if cached is not None:
+            return cached
+        
+        # Detect locally when possible; only unsure results go to the API
+        if CLD3_AVAILABLE:
+            prediction = cld3.get_language(text)
+            # CLD3 uses some codes LibreTranslate doesn't ("iw" for Hebrew) and tags romanized
+            # text with a script ("hi-Latn"); those, and unsure results, go to /detect
+            if (prediction is not None and prediction.is_reliable
+                    and "-" not in prediction.language
+                    and prediction.language in await self._language_codes()):
+                self._remember_language(key, prediction.language)
+                return prediction.language
+        
         try:
             response = await self.client.post(
                 f"{self.base_url}/detect",
-                json={"q": text}
+                json={"q": text},
+                timeout=self.timeout
             )
             response.raise_for_status()
             result = response.json()
             
             if isinstance(result, list) and len(result) > 0:
-                return result[0].get("language", "en")
+                language = result[0].get("language", "en")
+                self._remember_language(key, language)
+                return language
             return "en"  # Default to English if detection fails
             
         except Exception as e:
             print(f"Language detection error: {e}")
             return "en"  # Fallback to English
     
+    async def _language_codes(self) -> frozenset:
+        """Codes LibreTranslate supports; empty (and retried next time) if /languages fails"""
+        global _LANGUAGE_CODES
+        if _LANGUAGE_CODES is None:
+            async with _LANGUAGE_CODES_LOCK:
+                if _LANGUAGE_CODES is None:
+                    try:
+                        response = await self.client.get(f"{self.base_url}/languages", timeout=self.timeout)
+                        response.raise_for_status()
+                        _LANGUAGE_CODES = frozenset(lang["code"] for lang in response.json())
+                    except Exception as e:
+                        print(f"Error fetching supported languages: {e}")
+                        return frozenset()
+        return _LANGUAGE_CODES
+    
+    def _remember_language(self, key: bytes, language: str):
+        """Store a detection result, evicting the oldest when full"""
+        if len(_DETECT_CACHE) >= DETECT_CACHE_SIZE:
+            _DETECT_CACHE.pop(next(iter(_DETECT_CACHE)))
+        _DETECT_CACHE[key] = language
+    
     async def translate(
         self, 
         text: str, 
@@ -68,30 +183,96 @@ class LibreTranslateService:
             if source_lang is None:
                 source_lang = await self.detect_language(text)
             
-            # Skip translation if source and target are the same
-            if source_lang == target_lang:
-                return text
+            translations = await self.translate_batch([text], target_lang, source_lang)
+            return translations[0]
             
-            # Call LibreTranslate API
-            response = await self.client.post(
-                f"{self.base_url}/translate",
-                json={
-                    "q": text,
+        except TranslationError:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Translation failed: {str(e)}")
+    
+    async def translate_batch(
+        self,
+        texts: List[str],
+        target_lang: str,
+        source_lang: str
+    ) -> List[str]:
+        """
+        Translate several texts from the same source language in one request
+        
+        LibreTranslate accepts a list for "q" and then returns a list of translations
+        
+        Args:
+            texts: Texts to translate
+            target_lang: Target language code
+            source_lang: Source language code shared by all texts
+            
+        Returns:
+            Translated texts in input order
+        """
+        if not texts:
+            return []
+        
+        # Skip translation if source and target are the same
+        if source_lang == target_lang:
+            return list(texts)
+        
+        # Only send texts we haven't translated before, each once. Hits are copied out now:
+        # this batch's inserts or a concurrent call may evict them from the cache meanwhile
+        known = {}
+        misses = []
+        for text in dict.fromkeys(texts):
+            cached = _TRANSLATION_CACHE.get((source_lang, target_lang, text))
+            if cached is None:
+                misses.append(text)
+            else:
+                known[text] = cached
+        
+        try:
+            if misses:
+                # Call LibreTranslate API once for the whole batch
+                result = await self._post_translate({
+                    "q": misses,
                     "source": source_lang,
                     "target": target_lang,
                     "format": "text"
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
+                })
+                
+                translated = result.get("translatedText")
+                if translated is None:
+                    raise TranslationError("LibreTranslate response has no translatedText")
+                if isinstance(translated, str):
+                    translated = [translated]
+                if len(translated) != len(misses):
+                    raise TranslationError(
+                        f"LibreTranslate returned {len(translated)} translations for {len(misses)} texts"
+                    )
+                for text, translation in zip(misses, translated):
+                    if len(_TRANSLATION_CACHE) >= TRANSLATION_CACHE_SIZE:
+                        _TRANSLATION_CACHE.pop(next(iter(_TRANSLATION_CACHE)))
+                    _TRANSLATION_CACHE[(source_lang, target_lang, text)] = translation
+                
+                known.update(zip(misses, translated))
             
-            return result.get("translatedText", text)
+            return [known[text] for text in texts]
             
         except httpx.HTTPError as e:
             raise TranslationError(f"LibreTranslate API error: {str(e)}")
+        except TranslationError:
+            raise
         except Exception as e:
             raise TranslationError(f"Translation failed: {str(e)}")
     
+    @retry_with_backoff(_is_rate_limit, attempts=settings.EXTERNAL_API_MAX_ATTEMPTS)
+    async def _post_translate(self, payload: dict):
+        """POST to /translate, retrying with backoff when rate limited"""
+        async with _TRANSLATE_SEM:
+            response = await self.client.post(
+                f"{self.base_url}/translate", json=payload, timeout=self.timeout
+            )
+        response.raise_for_status()
+        return response.json()
+    
     async def get_supported_languages(self) -> list:
         """
         Get list of supported languages
@@ -100,7 +281,7 @@ class LibreTranslateService:
             List of language dicts with 'code' and 'name'
         """
         try:
-            response = await self.client.get(f"{self.base_url}/languages")
+            response = await self.client.get(f"{self.base_url}/languages", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -1,14 +1,26 @@
 try:
     from google.cloud import vision
+    from google.api_core.exceptions import ResourceExhausted
     VISION_AVAILABLE = True
 except ImportError:
     VISION_AVAILABLE = False
     vision = None
+    ResourceExhausted = None
 
+import asyncio
 import io
 import os
 import base64
+from typing import List
 from app.config import settings
+from app.core.utils import retry_with_backoff
+
+# Google Vision accepts at most 16 images per BatchAnnotateImages request
+VISION_BATCH_SIZE = 16
+
+# Caps in-flight Vision calls across all OCRService instances (one is built per
+# request) so bursts of captures don't exhaust the quota
+_VISION_SEM = asyncio.Semaphore(settings.EXTERNAL_API_MAX_CONCURRENCY)
 
 
 class OCRError(Exception):
@@ -16,6 +28,11 @@ class OCRError(Exception):
     pass
 
 
+def _is_quota_error(error: Exception) -> bool:
+    """True when Vision rejected the call for quota / rate limit reasons"""
+    return ResourceExhausted is not None and isinstance(error, ResourceExhausted)
+
+
 class OCRService:
     def __init__(self):
         if not VISION_AVAILABLE:
@@ -27,14 +44,29 @@ class OCRService:
         
         self.client = vision.ImageAnnotatorClient()
 
+    @retry_with_backoff(_is_quota_error, attempts=settings.EXTERNAL_API_MAX_ATTEMPTS)
+    async def _call_vision(self, method, **kwargs):
+        """Run a Vision client call, retrying with backoff on ResourceExhausted"""
+        async with _VISION_SEM:
+            # The client is synchronous; run it off the event loop so calls actually overlap
+            return await asyncio.to_thread(method, **kwargs)
+
     async def extract_text(self, image_base64: str) -> str:
         try:
             # Decode the base64 string to bytes
             content = base64.b64decode(image_base64)
+        except Exception as e:
+            raise OCRError(f"OCR processing failed: {str(e)}")
+        
+        return await self.extract_text_bytes(content)
+
+    async def extract_text_bytes(self, content: bytes) -> str:
+        """Extract text from raw image bytes (no base64 round-trip)"""
+        try:
             image = vision.Image(content=content)
 
             # Call Google Vision API
-            response = self.client.text_detection(image=image)
+            response = await self._call_vision(self.client.text_detection, image=image)
             texts = response.text_annotations
 
             if response.error.message:
@@ -46,4 +78,35 @@ class OCRService:
             return ""
             
         except Exception as e:
-            raise OCRError(f"OCR processing failed: {str(e)}")
\ No newline at end of file
+            raise OCRError(f"OCR processing failed: {str(e)}")
+
+    async def extract_text_batch(self, images_base64: List[str]) -> List[str]:
+        """
+        Extract text from several images, one Vision request per 16 images
+        
+        Returns the text for each image in input order ("" where none was found)
+        """
+        try:
+            feature = vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)
+            results = []
+            
+            for start in range(0, len(images_base64), VISION_BATCH_SIZE):
+                requests = [
+                    vision.AnnotateImageRequest(
+                        image=vision.Image(content=base64.b64decode(image_base64)),
+                        features=[feature]
+                    )
+                    for image_base64 in images_base64[start:start + VISION_BATCH_SIZE]
+                ]
+                response = await self._call_vision(self.client.batch_annotate_images, requests=requests)
+                
+                for image_response in response.responses:
+                    if image_response.error.message:
+                        raise OCRError(f"Google Vision API Error: {image_response.error.message}")
+                    texts = image_response.text_annotations
+                    results.append(texts[0].description if texts else "")
+            
+            return results
+            
+        except Exception as e:
+            raise OCRError(f"OCR processing failed: {str(e)}")
@@ -1,3 +1,5 @@
+import httpx
+from typing import Optional
 from app.services.ocr_service import OCRService
 from app.services.libre_service import LibreTranslateService
 
@@ -9,9 +11,9 @@ class TranslateService:
     - Image translation: Google Vision OCR → LibreTranslate translation
     """
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.ocr_engine = OCRService()  # Google Cloud Vision for OCR
-        self.translator = LibreTranslateService()  # For actual translation
+        self.translator = LibreTranslateService(client)  # For actual translation
     
     async def close(self):
         """Cleanup clients"""
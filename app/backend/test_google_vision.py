@@ -3,7 +3,6 @@ Test Google Cloud Vision OCR
 Run after setting up service_account.json
 """
 import asyncio
-import base64
 import sys
 import os
 
@@ -11,17 +10,21 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.ocr_service import OCRService
+from tests._fixtures import TINY_PNG_B64, load_image_b64
 
 
 async def test_google_vision_ocr():
-    """Test Google Vision OCR with a sample image"""
+    """Test Google Vision OCR with a sample image
+    
+    Returns the initialized OCRService so later tests can reuse its client
+    """
     
     print("=" * 60)
     print("Testing Google Cloud Vision OCR")
     print("=" * 60)
     
-    # Simple test image (1x1 red pixel - won't have text, but tests API connection)
-    test_image = "iVBORw0KGgoAAAANSUhEUgAAAAUAAAAFCAYAAACNbyblAAAAHElEQVQI12P4//8/w38GIAXDIBKE0DHxgljNBAAO9TXL0Y4OHwAAAABJRU5ErkJggg=="
+    # Simple test image (won't have text, but tests API connection)
+    test_image = TINY_PNG_B64
     
     try:
         print("\n1. Initializing OCR Service...")
@@ -45,6 +48,7 @@ async def test_google_vision_ocr():
         print("   1. Test with real image containing text")
         print("   2. Run full translation test: python test_translation.py")
         print("   3. Start backend and test via Swagger UI")
+        return ocr
         
     except Exception as e:
         print("\n" + "=" * 60)
@@ -57,9 +61,10 @@ async def test_google_vision_ocr():
         print("   3. Check Vision API is enabled in Google Cloud Console")
         print("   4. Verify service account has correct permissions")
         print("\n📚 See GOOGLE_VISION_SETUP.md for detailed instructions")
+        return None
 
 
-async def test_with_text_image():
+async def test_with_text_image(ocr: OCRService = None):
     """Test with an actual image containing text (if you have one)"""
     print("\n" + "=" * 60)
     print("Optional: Test with your own image")
@@ -74,11 +79,10 @@ async def test_with_text_image():
         return
     
     try:
-        with open(image_path, "rb") as image_file:
-            image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+        image_base64 = load_image_b64(image_path)
         
         print(f"\n1. Loading image: {image_path}")
-        ocr = OCRService()
+        ocr = ocr or OCRService()
         text = await ocr.extract_text(image_base64)
         
         print(f"\n✅ Extracted text:")
@@ -88,9 +92,15 @@ async def test_with_text_image():
         print(f"❌ Error: {e}")
 
 
-if __name__ == "__main__":
-    print("\n🚀 Starting Google Vision OCR Test...\n")
-    asyncio.run(test_google_vision_ocr())
+async def main():
+    """Run the OCR tests on one event loop, sharing one Vision client"""
+    ocr = await test_google_vision_ocr()
     
     # Uncomment to test with your own image:
-    # asyncio.run(test_with_text_image())
+    # if ocr:
+    #     await test_with_text_image(ocr)
+
+
+if __name__ == "__main__":
+    print("\n🚀 Starting Google Vision OCR Test...\n")
+    asyncio.run(main())
@@ -3,12 +3,33 @@ Test script to manually send location updates and test navigation flow
 Run this after starting navigation with: "navigate to lulu mall kochi"
 """
 
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import os
+import re
+import sys
 import time
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Fail fast when the backend is down instead of blocking for the full read timeout
+CONNECT_TIMEOUT = 1.0
+
+# One keep-alive session for every request in this script
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+))
+SESSION.headers.update({"Accept": "application/json"})
+
+# "send <lat> <lon>" in interactive mode
+SEND_COMMAND = re.compile(r"^send\s+(\S+)\s+(\S+)")
+
 # Sample location near Kochi, India (adjust to your actual location)
 SAMPLE_LOCATIONS = [
     {"latitude": 10.0261, "longitude": 76.3125, "accuracy": 10.0},  # Near Kochi
@@ -17,13 +38,20 @@ SAMPLE_LOCATIONS = [
 ]
 
 
+def format_json(data):
+    """Compact JSON for log lines; set DEBUG_JSON=1 to pretty-print"""
+    if os.getenv("DEBUG_JSON"):
+        return json.dumps(data, indent=2)
+    return json.dumps(data)
+
+
 def check_session_status():
     """Check current navigation session status"""
     print("\n🔍 Checking navigation session status...")
     try:
-        response = requests.get(f"{BASE_URL}/location/session/status")
+        response = SESSION.get(f"{BASE_URL}/location/session/status", timeout=(CONNECT_TIMEOUT, 10))
         data = response.json()
-        print(f"Response: {json.dumps(data, indent=2)}")
+        print(f"Response: {format_json(data)}")
         return data
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -43,14 +71,14 @@ def send_location_update(lat, lon, accuracy=10.0):
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/location/update",
             json=payload,
-            timeout=30
+            timeout=(CONNECT_TIMEOUT, 30)
         )
         
         data = response.json()
-        print(f"Response: {json.dumps(data, indent=2)}")
+        print(f"Response: {format_json(data)}")
         return data
     
     except Exception as e:
@@ -58,7 +86,36 @@ def send_location_update(lat, lon, accuracy=10.0):
         return None
 
 
-def test_navigation_flow():
+def send_location_batch(locations):
+    """Send several location updates in a single HTTP call"""
+    print(f"\n📍 Sending {len(locations)} locations in one batch")
+    try:
+        payload = [
+            {
+                "latitude": loc["latitude"],
+                "longitude": loc["longitude"],
+                "accuracy": loc["accuracy"],
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            }
+            for loc in locations
+        ]
+        
+        response = SESSION.post(
+            f"{BASE_URL}/location/batch",
+            json=payload,
+            timeout=(CONNECT_TIMEOUT, 30)
+        )
+        
+        data = response.json()
+        print(f"Response: {format_json(data)}")
+        return data
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
+
+
+def test_navigation_flow(assume_yes=False, batch=False):
     """Test the complete navigation flow"""
     print("=" * 60)
     print("🧪 NAVIGATION LOCATION TEST")
@@ -70,14 +127,14 @@ def test_navigation_flow():
     print("\nStarting navigation now...")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/assistant/ask",
             json={"query": "navigate to lulu mall kochi", "user_id": "test_user"},
-            timeout=10
+            timeout=(CONNECT_TIMEOUT, 10)
         )
         print(f"Response: {response.status_code}")
         if response.status_code == 200:
-            print(f"Data: {json.dumps(response.json(), indent=2)}")
+            print(f"Data: {format_json(response.json())}")
     except Exception as e:
         print(f"❌ Error starting navigation: {e}")
         return
@@ -98,33 +155,45 @@ def test_navigation_flow():
     
     if session.get('status') != 'waiting_for_location':
         print("\n⚠️ Session is not waiting for location. It might already have a route.")
-        print("   Do you want to send location updates anyway? (y/n)")
-        if input().lower() != 'y':
-            return
+        if not assume_yes:
+            if not sys.stdin.isatty():
+                print("   Re-run with --yes to send location updates anyway.")
+                return
+            print("   Do you want to send location updates anyway? (y/n)")
+            if input().lower() != 'y':
+                return
     
     # Send location updates
     print("\nSTEP 3: Sending location updates...")
-    for i, loc in enumerate(SAMPLE_LOCATIONS, 1):
-        print(f"\n--- Location update {i}/{len(SAMPLE_LOCATIONS)} ---")
-        result = send_location_update(
-            loc["latitude"],
-            loc["longitude"],
-            loc["accuracy"]
-        )
-        
+    if batch:
+        # Backend navigates from the most recent point of the batch
+        result = send_location_batch(SAMPLE_LOCATIONS)
         if result and result.get("navigation_active"):
             print(f"\n✅ Navigation active!")
             print(f"   Status: {result.get('navigation_status')}")
             print(f"   Instruction: {result.get('instruction', 'N/A')}")
+    else:
+        for i, loc in enumerate(SAMPLE_LOCATIONS, 1):
+            print(f"\n--- Location update {i}/{len(SAMPLE_LOCATIONS)} ---")
+            result = send_location_update(
+                loc["latitude"],
+                loc["longitude"],
+                loc["accuracy"]
+            )
             
-            if result.get('navigation_status') == 'active':
-                print("\n🎉 Navigation route calculated successfully!")
-                print("   Distance to next: {:.1f}m".format(result.get('distance_to_next', 0)))
-        
-        # Wait a bit between updates (simulating real location updates)
-        if i < len(SAMPLE_LOCATIONS):
-            print("\nWaiting 2 seconds before next update...")
-            time.sleep(2)
+            if result and result.get("navigation_active"):
+                print(f"\n✅ Navigation active!")
+                print(f"   Status: {result.get('navigation_status')}")
+                print(f"   Instruction: {result.get('instruction', 'N/A')}")
+                
+                if result.get('navigation_status') == 'active':
+                    print("\n🎉 Navigation route calculated successfully!")
+                    print("   Distance to next: {:.1f}m".format(result.get('distance_to_next', 0)))
+            
+            # Wait a bit between updates (simulating real location updates)
+            if i < len(SAMPLE_LOCATIONS):
+                print("\nWaiting 2 seconds before next update...")
+                time.sleep(2)
     
     # Final status check
     print("\nSTEP 4: Final status check...")
@@ -147,6 +216,11 @@ def interactive_mode():
     print("  quit - Exit")
     print()
     
+    commands = {
+        "status": check_session_status,
+        "sample": lambda: send_location_update(10.0261, 76.3125, 10.0),
+    }
+    
     while True:
         try:
             cmd = input("\n> ").strip().lower()
@@ -154,21 +228,16 @@ def interactive_mode():
             if cmd == "quit":
                 break
             
-            elif cmd == "status":
-                check_session_status()
-            
-            elif cmd == "sample":
-                send_location_update(10.0261, 76.3125, 10.0)
+            handler = commands.get(cmd)
+            if handler:
+                handler()
+                continue
             
+            match = SEND_COMMAND.match(cmd)
+            if match:
+                send_location_update(float(match.group(1)), float(match.group(2)))
             elif cmd.startswith("send"):
-                parts = cmd.split()
-                if len(parts) >= 3:
-                    lat = float(parts[1])
-                    lon = float(parts[2])
-                    send_location_update(lat, lon)
-                else:
-                    print("❌ Usage: send <latitude> <longitude>")
-            
+                print("❌ Usage: send <latitude> <longitude>")
             else:
                 print("❌ Unknown command. Type 'quit' to exit.")
         
@@ -180,14 +249,26 @@ def interactive_mode():
 
 
 if __name__ == "__main__":
-    print("\nChoose mode:")
-    print("  1. Automated test flow")
-    print("  2. Interactive mode")
-    choice = input("\nChoice (1 or 2): ").strip()
+    parser = argparse.ArgumentParser(description="Send location updates to test navigation")
+    parser.add_argument("--mode", choices=["auto", "interactive"],
+                        help="auto: run the automated test flow, interactive: manual location sender")
+    parser.add_argument("--yes", action="store_true",
+                        help="Send location updates even if the session is not waiting for a location")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send the sample locations in one /location/batch call instead of one every 2 seconds")
+    args = parser.parse_args()
+    
+    mode = args.mode
+    if mode is None and sys.stdin.isatty():
+        print("\nChoose mode:")
+        print("  1. Automated test flow")
+        print("  2. Interactive mode")
+        choice = input("\nChoice (1 or 2): ").strip()
+        mode = {"1": "auto", "2": "interactive"}.get(choice)
     
-    if choice == "1":
-        test_navigation_flow()
-    elif choice == "2":
+    if mode == "auto":
+        test_navigation_flow(assume_yes=args.yes, batch=args.batch)
+    elif mode == "interactive":
         interactive_mode()
     else:
         print("Invalid choice")
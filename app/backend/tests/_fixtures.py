@@ -0,0 +1,29 @@
+"""
+Shared test data for the backend test scripts
+"""
+import mmap
+import os
+from functools import lru_cache
+
+try:
+    import pybase64 as base64  # SIMD base64, drop-in for the stdlib module
+except ImportError:
+    import base64
+
+
+# Minimal PNG (5x5, no text) - enough to exercise the OCR API connection
+TINY_PNG_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAUAAAAFCAYAAACNbyblAAAAHElEQVQI12P4//8/w38GIAXDIBKE0DHxgljNBAAO9TXL0Y4OHwAAAABJRU5ErkJggg=="
+TINY_PNG_BYTES = base64.b64decode(TINY_PNG_B64)
+
+
+@lru_cache(maxsize=8)
+def load_image_b64(path: str) -> str:
+    """Read an image file once and return it base64 encoded
+    
+    The file is memory-mapped, so its raw bytes are never copied into a Python object
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return base64.b64encode(mm).decode('utf-8')
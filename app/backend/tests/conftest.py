@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures for the backend tests
+External services are created once per session and skipped when not configured
+"""
+import pytest
+
+from tests._fixtures import TINY_PNG_B64, TINY_PNG_BYTES
+
+
+@pytest.fixture(scope="session")
+def tiny_png_b64():
+    """Minimal PNG with no text"""
+    return TINY_PNG_B64
+
+
+@pytest.fixture(scope="session")
+def tiny_png_bytes():
+    """Same PNG, already decoded"""
+    return TINY_PNG_BYTES
+
+
+@pytest.fixture(scope="session")
+def ocr():
+    """Google Vision OCR service shared by the whole test session"""
+    try:
+        from app.services.ocr_service import OCRService
+        return OCRService()
+    except Exception as e:
+        pytest.skip(f"Google Vision OCR unavailable: {e}")
+
+
+@pytest.fixture
+async def translator():
+    """LibreTranslate client (its httpx client is bound to the test's event loop)"""
+    try:
+        import httpx
+        from app.services.libre_service import LibreTranslateService
+        service = LibreTranslateService(client=httpx.AsyncClient())
+    except Exception as e:
+        pytest.skip(f"LibreTranslate service unavailable: {e}")
+    yield service
+    await service.close()
@@ -0,0 +1,94 @@
+"""
+Tests for the image translation pipeline (Google Vision OCR + LibreTranslate)
+"""
+import json
+
+import httpx
+import pytest
+
+from app.core.exceptions import TranslationError
+from app.services import libre_service
+
+
+async def test_ocr(ocr, tiny_png_b64):
+    """OCR round-trip succeeds on an image without text"""
+    text = await ocr.extract_text(tiny_png_b64)
+    assert isinstance(text, str)
+
+
+async def test_ocr_bytes(ocr, tiny_png_bytes):
+    """Raw-bytes OCR skips the base64 decode"""
+    text = await ocr.extract_text_bytes(tiny_png_bytes)
+    assert isinstance(text, str)
+
+
+async def test_ocr_batch_returns_one_result_per_image(ocr, tiny_png_b64):
+    """Batched OCR keeps input order and length"""
+    texts = await ocr.extract_text_batch([tiny_png_b64, tiny_png_b64])
+    assert len(texts) == 2
+
+
+async def test_translate_same_language_returns_input(translator):
+    """No API call is made when source and target languages match"""
+    assert await translator.translate("Hello friend", "en", "en") == "Hello friend"
+
+
+@pytest.fixture
+async def mock_libre():
+    """
+    LibreTranslate service backed by httpx.MockTransport (no network)
+    Yields the service, the list of /translate payloads it sent, and a dict that,
+    when filled in, replaces the echoed response body
+    """
+    payloads = []
+    reply = {}
+
+    def handler(request):
+        body = json.loads(request.content)
+        payloads.append(body)
+        if "translatedText" in reply:
+            return httpx.Response(200, json=reply)
+        return httpx.Response(200, json={"translatedText": [f"<{q}>" for q in body["q"]]})
+
+    libre_service._TRANSLATION_CACHE.clear()
+    service = libre_service.LibreTranslateService(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    yield service, payloads, reply
+    await service.close()
+    libre_service._TRANSLATION_CACHE.clear()
+
+
+async def test_translate_batch_sends_duplicates_once(mock_libre):
+    """Repeated texts in one batch go out in a single POST, each once"""
+    service, payloads, _ = mock_libre
+    result = await service.translate_batch(["hola", "adios", "hola"], "en", "es")
+    assert result == ["<hola>", "<adios>", "<hola>"]
+    assert payloads == [{"q": ["hola", "adios"], "source": "es", "target": "en", "format": "text"}]
+
+
+async def test_translate_batch_cached_texts_skip_the_api(mock_libre):
+    """A second call with already translated texts makes no request"""
+    service, payloads, _ = mock_libre
+    first = await service.translate_batch(["hola", "adios"], "en", "es")
+    second = await service.translate_batch(["adios", "hola"], "en", "es")
+    assert second == first[::-1]
+    assert len(payloads) == 1
+
+
+async def test_translate_batch_length_mismatch_raises(mock_libre):
+    """A response with the wrong number of translations is an error, not a partial result"""
+    service, _, reply = mock_libre
+    reply["translatedText"] = ["only one"]
+    with pytest.raises(TranslationError):
+        await service.translate_batch(["hola", "adios"], "en", "es")
+    assert not libre_service._TRANSLATION_CACHE
+
+
+async def test_translate_batch_missing_translation_raises(mock_libre):
+    """A response without translatedText never caches the source text as its translation"""
+    service, _, reply = mock_libre
+    reply["translatedText"] = None
+    with pytest.raises(TranslationError):
+        await service.translate_batch(["hola"], "en", "es")
+    assert not libre_service._TRANSLATION_CACHE
@@ -1,11 +1,54 @@
 """
 Pydantic models for Face Recognition API
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
-from datetime import datetime
+import re
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
+from typing import Annotated, Optional, List, Tuple
+from datetime import datetime, timezone
 import config
 
+# Optional data URI prefix (any media type), then standard base64 with padding only at the end
+BASE64_IMAGE_PATTERN = re.compile(r"(?:data:[^;,]*;base64,)?([A-Za-z0-9+/]+={0,2})")
+
+# Line breaks etc. in MIME / `base64` CLI output, which b64decode skips
+WHITESPACE = re.compile(r"\s+")
+
+# Longest base64 string that can hold a config.MAX_IMAGE_SIZE image (plus a data URI prefix)
+MAX_IMAGE_BASE64_LENGTH = config.MAX_IMAGE_SIZE * 4 // 3 + 64
+
+
+# Whitespace is stripped before the length check, so blank strings are rejected
+NameStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)]
+DescriptionStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=200)]
+
+
+def utc_now() -> datetime:
+    """Timezone-aware UTC timestamp for response models"""
+    return datetime.now(timezone.utc)
+
+
+def validate_image_base64(v: str) -> str:
+    """
+    Cheap shape check for a base64 image so bad payloads fail before decoding
+    
+    Checks length and alphabet only; the image itself is decoded by the service
+    """
+    v = WHITESPACE.sub("", v) if v else v
+    if not v:
+        raise ValueError("image_base64 cannot be empty")
+    if len(v) > MAX_IMAGE_BASE64_LENGTH:
+        raise ValueError(f"image_base64 exceeds the {config.MAX_IMAGE_SIZE // (1024 * 1024)}MB image size limit")
+    
+    match = BASE64_IMAGE_PATTERN.fullmatch(v)
+    if not match or len(match.group(1)) % 4:
+        raise ValueError("image_base64 is not valid base64")
+    return v
+
+
+def numpy_to_builtin(v):
+    """Turn numpy arrays/scalars from FaceMatcher (bbox, det_score) into plain Python values"""
+    return v.tolist() if hasattr(v, "tolist") else v
+
 
 # ==================== REQUEST MODELS ====================
 
@@ -19,21 +62,18 @@ class RecognizeRequest(BaseModel):
         description="Similarity threshold for face matching (0.3-0.9)"
     )
     
-    @validator('image_base64')
+    @field_validator('image_base64')
+    @classmethod
     def validate_image_not_empty(cls, v):
-        if not v or not v.strip():
-            raise ValueError("image_base64 cannot be empty")
-        return v
+        return validate_image_base64(v)
 
 
 class EnrollRequest(BaseModel):
     """Request model for face enrollment endpoint"""
     image_base64: str = Field(..., description="Base64 encoded image string")
-    name: str = Field(..., min_length=1, max_length=100, description="Person's name")
-    description: str = Field(
-        ..., 
-        min_length=1, 
-        max_length=200, 
+    name: NameStr = Field(..., description="Person's name")
+    description: DescriptionStr = Field(
+        ...,
         description="Relation or description (e.g., 'Friend', 'Colleague')"
     )
     threshold: Optional[float] = Field(
@@ -43,23 +83,10 @@ class EnrollRequest(BaseModel):
         description="Threshold for duplicate detection (0.3-0.9)"
     )
     
-    @validator('image_base64')
+    @field_validator('image_base64')
+    @classmethod
     def validate_image_not_empty(cls, v):
-        if not v or not v.strip():
-            raise ValueError("image_base64 cannot be empty")
-        return v
-    
-    @validator('name')
-    def validate_name(cls, v):
-        if not v.strip():
-            raise ValueError("name cannot be empty or whitespace")
-        return v.strip()
-    
-    @validator('description')
-    def validate_description(cls, v):
-        if not v.strip():
-            raise ValueError("description cannot be empty or whitespace")
-        return v.strip()
+        return validate_image_base64(v)
 
 
 # ==================== RESPONSE MODELS ====================
@@ -69,7 +96,12 @@ class FaceMatch(BaseModel):
     name: str = Field(..., description="Name of the recognized person")
     description: str = Field(..., description="Relation or description")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Match confidence score (0-1)")
-    bounding_box: List[int] = Field(..., description="Face bounding box [x1, y1, x2, y2]")
+    bounding_box: Tuple[int, int, int, int] = Field(..., description="Face bounding box [x1, y1, x2, y2]")
+    
+    @field_validator('bounding_box', mode='before')
+    @classmethod
+    def accept_ndarray(cls, v):
+        return numpy_to_builtin(v)
 
 
 class RecognizeResponse(BaseModel):
@@ -78,31 +110,30 @@ class RecognizeResponse(BaseModel):
     message: str = Field(..., description="Status message")
     faces_detected: int = Field(..., ge=0, description="Number of faces detected in the image")
     faces: List[FaceMatch] = Field(default=[], description="List of recognized faces")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Response timestamp")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "message": "Face recognition completed",
-                "faces_detected": 2,
-                "faces": [
-                    {
-                        "name": "John Doe",
-                        "description": "Friend",
-                        "confidence": 0.87,
-                        "bounding_box": [100, 150, 300, 400]
-                    },
-                    {
-                        "name": "Jane Smith",
-                        "description": "Colleague",
-                        "confidence": 0.92,
-                        "bounding_box": [400, 150, 600, 400]
-                    }
-                ],
-                "timestamp": "2026-01-25T10:30:00"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "message": "Face recognition completed",
+            "faces_detected": 2,
+            "faces": [
+                {
+                    "name": "John Doe",
+                    "description": "Friend",
+                    "confidence": 0.87,
+                    "bounding_box": [100, 150, 300, 400]
+                },
+                {
+                    "name": "Jane Smith",
+                    "description": "Colleague",
+                    "confidence": 0.92,
+                    "bounding_box": [400, 150, 600, 400]
+                }
+            ],
+            "timestamp": "2026-01-25T10:30:00Z"
         }
+    })
 
 
 class EnrollResponse(BaseModel):
@@ -112,19 +143,23 @@ class EnrollResponse(BaseModel):
     person_id: Optional[int] = Field(None, description="Database ID of enrolled person")
     name: Optional[str] = Field(None, description="Name of enrolled person")
     confidence: Optional[float] = Field(None, description="Embedding quality confidence")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Response timestamp")
+    
+    @field_validator('confidence', mode='before')
+    @classmethod
+    def accept_numpy_scalar(cls, v):
+        return numpy_to_builtin(v)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": True,
-                "message": "Face enrolled successfully",
-                "person_id": 13,
-                "name": "John Doe",
-                "confidence": 0.95,
-                "timestamp": "2026-01-25T10:30:00"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "message": "Face enrolled successfully",
+            "person_id": 13,
+            "name": "John Doe",
+            "confidence": 0.95,
+            "timestamp": "2026-01-25T10:30:00Z"
         }
+    })
 
 
 class ErrorResponse(BaseModel):
@@ -132,17 +167,16 @@ class ErrorResponse(BaseModel):
     success: bool = Field(default=False, description="Always False for errors")
     error: str = Field(..., description="Error type")
     message: str = Field(..., description="Detailed error message")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Error timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Error timestamp")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "success": False,
-                "error": "ValidationError",
-                "message": "Invalid image format",
-                "timestamp": "2026-01-25T10:30:00"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": False,
+            "error": "ValidationError",
+            "message": "Invalid image format",
+            "timestamp": "2026-01-25T10:30:00Z"
         }
+    })
 
 
 class HealthResponse(BaseModel):
@@ -152,4 +186,4 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="Service version")
     model_loaded: bool = Field(..., description="Whether the model is loaded")
     database_connected: bool = Field(..., description="Whether database is accessible")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Health check timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Health check timestamp")
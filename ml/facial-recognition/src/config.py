@@ -11,14 +11,27 @@ SERVICE_NAME = "S.A.G.E Face Recognition Service"
 SERVICE_VERSION = "1.0.0"
 
 # Model Configuration
-INSIGHTFACE_MODEL = "buffalo_l"  # High accuracy model
+INSIGHTFACE_MODEL = "buffalo_l"  # High accuracy model ("buffalo_l_int8" after running training/quantize_model.py)
 DETECTION_SIZE = (640, 640)  # Detection resolution
-PROVIDERS = ['CPUExecutionProvider']  # Use CPU (change to CUDA if GPU available)
+EMBEDDING_DIM = 512  # buffalo_l face embedding size
+# Tried in order; providers this onnxruntime build doesn't offer are skipped, so CPU-only installs are unaffected
+PROVIDERS = [
+    ('TensorrtExecutionProvider', {
+        'trt_fp16_enable': True,
+        'trt_engine_cache_enable': True,  # Building the TensorRT engine takes minutes; reuse it across restarts
+        'trt_engine_cache_path': str(Path(__file__).parent.absolute() / "models" / "trt_cache"),
+    }),
+    'CUDAExecutionProvider',
+    'CPUExecutionProvider',
+]
 
 # Face Recognition Settings
 DEFAULT_THRESHOLD = 0.5  # Standard threshold for buffalo_l model
 MIN_THRESHOLD = 0.3  # Minimum allowed threshold
 MAX_THRESHOLD = 0.9  # Maximum allowed threshold
+USE_INT8_SEARCH = True  # int8 pre-filter + float32 re-score (only when simsimd is installed)
+INT8_SEARCH_MARGIN = 0.05  # How far below the threshold int8 candidates are still re-scored
+EMBEDDING_INITIAL_CAPACITY = 256  # Rows reserved in the in-memory matrix (doubles when full)
 
 # Database Configuration
 SCRIPT_DIR = Path(__file__).parent.absolute()
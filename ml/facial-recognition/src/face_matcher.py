@@ -3,7 +3,9 @@ Face Matcher Service
 Core logic for face recognition and enrollment
 """
 import sqlite3
+import threading
 import numpy as np
+import onnxruntime
 from typing import List, Dict, Optional, Tuple
 from insightface.app import FaceAnalysis
 import logging
@@ -12,6 +14,36 @@ from utils.db_helper import adapt_array, convert_array, init_db
 
 logger = logging.getLogger(__name__)
 
+try:
+    import simsimd  # SIMD dot-product kernels (AVX-512 / NEON), picked at runtime
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    simsimd = None
+    SIMSIMD_AVAILABLE = False
+
+
+def available_providers(providers: List) -> List:
+    """Keep only the execution providers (names or (name, options) tuples) this onnxruntime build offers"""
+    available = set(onnxruntime.get_available_providers())
+    return [p for p in providers if (p[0] if isinstance(p, tuple) else p) in available]
+
+
+def quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+    """Symmetric int8 quantization of L2-normalized embeddings (values in [-1, 1])"""
+    return np.ascontiguousarray(np.round(embeddings * 127), dtype=np.int8)
+
+
+def top_k_order(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the top_k highest scores, highest first (all of them if top_k is None)
+    
+    argpartition picks the top_k in linear time so only those get sorted
+    """
+    if top_k is not None and top_k < len(scores):
+        part = np.argpartition(-scores, top_k - 1)[:top_k] if top_k > 0 else np.empty(0, dtype=np.intp)
+        return part[np.argsort(-scores[part], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
 
 class FaceMatcherError(Exception):
     """Custom exception for face matching errors"""
@@ -28,6 +60,19 @@ class FaceMatcher:
         """Initialize the face matcher with InsightFace model"""
         self.model = None
         self.db_path = str(config.DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # Serializes use of the shared connection
+        self._cache_lock = threading.Lock()  # Serializes cache reloads/appends; searches read a snapshot
+        self._data_version = None  # PRAGMA data_version seen at the last cache load
+        
+        # In-memory copy of the people table: (N, 512) float32 matrix + (name, description) rows
+        # Rows [0, _emb_count) of the buffers are live; the rest is spare capacity for enrollments
+        self._emb_buffer = np.empty((0, config.EMBEDDING_DIM), dtype=np.float32)
+        self._emb_buffer_i8: Optional[np.ndarray] = None  # Quantized copy for the SimSIMD int8 pre-filter
+        self._emb_count = 0
+        self._emb_meta: List[Tuple[str, str]] = []
+        self._emb_dirty = True
+        
         self._initialize_model()
         self._initialize_database()
     
@@ -37,7 +82,7 @@ class FaceMatcher:
             logger.info(f"Loading InsightFace model: {config.INSIGHTFACE_MODEL}")
             self.model = FaceAnalysis(
                 name=config.INSIGHTFACE_MODEL,
-                providers=config.PROVIDERS
+                providers=available_providers(config.PROVIDERS)
             )
             self.model.prepare(ctx_id=0, det_size=config.DETECTION_SIZE)
             logger.info("✓ Model loaded successfully")
@@ -49,6 +94,13 @@ class FaceMatcher:
         """Initialize database if it doesn't exist"""
         try:
             init_db(self.db_path)
+            
+            # One connection for the lifetime of the service, shared across threads under self._lock
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+            self._conn.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
             logger.info(f"✓ Database initialized: {self.db_path}")
         except Exception as e:
             logger.error(f"Failed to initialize database: {str(e)}")
@@ -63,7 +115,7 @@ class FaceMatcher:
             
         Returns:
             List of detected faces with embeddings and bounding boxes
-            Format: [{"embedding": np.ndarray, "bbox": [x1, y1, x2, y2], "confidence": float}, ...]
+            Format: [{"embedding": np.ndarray, "bbox": int32 array [x1, y1, x2, y2], "confidence": np.float32}, ...]
         """
         try:
             faces = self.model.get(image)
@@ -72,8 +124,8 @@ class FaceMatcher:
             for face in faces:
                 results.append({
                     "embedding": face.normed_embedding,  # Already normalized
-                    "bbox": face.bbox.astype(int).tolist(),
-                    "confidence": float(face.det_score) if hasattr(face, 'det_score') else 1.0
+                    "bbox": face.bbox.astype(np.int32),
+                    "confidence": face.det_score if hasattr(face, 'det_score') else 1.0
                 })
             
             logger.info(f"Detected {len(results)} face(s) in image")
@@ -83,42 +135,38 @@ class FaceMatcher:
             logger.error(f"Face detection failed: {str(e)}")
             raise FaceMatcherError(f"Face detection failed: {str(e)}")
     
-    def find_matches(self, embedding: np.ndarray, threshold: float) -> List[Dict]:
+    def find_matches(self, embedding: np.ndarray, threshold: float, top_k: Optional[int] = None) -> List[Dict]:
         """
         Find matching faces in database for a given embedding
         
         Args:
             embedding: Face embedding vector (512D)
             threshold: Similarity threshold (0.0-1.0)
+            top_k: Only return the best top_k matches (all matches if None)
             
         Returns:
             List of matches sorted by confidence (highest first)
             Format: [{"name": str, "description": str, "confidence": float}, ...]
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name, description, embedding FROM people")
-            rows = cursor.fetchall()
-            conn.close()
+            matrix, matrix_i8, meta = self._snapshot()
             
-            matches = []
+            if len(matrix) == 0:
+                logger.info(f"Found 0 match(es) above threshold {threshold}")
+                return []
             
-            for name, description, emb_blob in rows:
-                known_emb = convert_array(emb_blob)
-                
-                # Calculate cosine similarity (embeddings are already normalized)
-                similarity = float(np.dot(embedding, known_emb))
-                
-                if similarity >= threshold:
-                    matches.append({
-                        "name": name,
-                        "description": description,
-                        "confidence": similarity
-                    })
+            idx, scores = self._score_above(embedding, threshold, matrix, matrix_i8)
+            order = top_k_order(scores, top_k)
+            idx, scores = idx[order], scores[order]
             
-            # Sort by confidence (highest first)
-            matches.sort(key=lambda x: x["confidence"], reverse=True)
+            matches = [
+                {
+                    "name": meta[i][0],
+                    "description": meta[i][1],
+                    "confidence": float(score)
+                }
+                for i, score in zip(idx, scores)
+            ]
             
             logger.info(f"Found {len(matches)} match(es) above threshold {threshold}")
             return matches
@@ -127,6 +175,186 @@ class FaceMatcher:
             logger.error(f"Database query failed: {str(e)}")
             raise FaceMatcherError(f"Database query failed: {str(e)}")
     
+    def match_batch(self, embeddings: np.ndarray, threshold: float, top_k: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Find matches for several embeddings at once
+        
+        Scores all M probes against the N cached faces with a single (M, 512) x (512, N)
+        product instead of M separate matrix-vector products
+        
+        Args:
+            embeddings: (M, 512) face embeddings
+            threshold: Similarity threshold (0.0-1.0)
+            top_k: Only return the best top_k matches per embedding (all matches if None)
+            
+        Returns:
+            One list per embedding, in the same format and order as find_matches
+        """
+        try:
+            matrix, _, meta = self._snapshot()
+            queries = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, config.EMBEDDING_DIM)
+            
+            if len(matrix) == 0:
+                return [[] for _ in range(len(queries))]
+            
+            if SIMSIMD_AVAILABLE:
+                scores = np.asarray(simsimd.cdist(queries, matrix, metric="dot"))
+            else:
+                scores = queries @ matrix.T
+            
+            results = []
+            for row in scores:
+                idx = np.flatnonzero(row >= threshold)
+                idx = idx[top_k_order(row[idx], top_k)]
+                results.append([
+                    {
+                        "name": meta[i][0],
+                        "description": meta[i][1],
+                        "confidence": float(row[i])
+                    }
+                    for i in idx
+                ])
+            
+            logger.info(f"Matched {len(queries)} face(s) against threshold {threshold}")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Database query failed: {str(e)}")
+            raise FaceMatcherError(f"Database query failed: {str(e)}")
+    
+    def _score_above(
+        self,
+        embedding: np.ndarray,
+        threshold: float,
+        matrix: np.ndarray,
+        matrix_i8: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Indices of cached faces scoring at least threshold, with their exact float32 scores
+        
+        With the int8 copy available, every face is scored with int8 cosine first and only
+        the candidates near or above the threshold are re-scored in float32
+        """
+        query = np.ascontiguousarray(embedding, dtype=np.float32)
+        if matrix_i8 is not None:
+            coarse = 1.0 - np.asarray(
+                simsimd.cdist(quantize_int8(query).reshape(1, -1), matrix_i8, metric="cosine")
+            ).ravel()
+            idx = np.flatnonzero(coarse >= threshold - config.INT8_SEARCH_MARGIN)
+            scores = matrix[idx] @ query
+        else:
+            # Cosine similarity against every known face at once (embeddings are already normalized)
+            scores = self._similarities(query, matrix)
+            idx = np.arange(len(scores))
+        
+        keep = scores >= threshold
+        return idx[keep], scores[keep]
+    
+    def _similarities(self, embedding: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Dot product of one embedding with every row of matrix"""
+        query = np.ascontiguousarray(embedding, dtype=np.float32)
+        if SIMSIMD_AVAILABLE:
+            return np.asarray(
+                simsimd.cdist(query.reshape(1, -1), matrix, metric="dot")
+            ).ravel()
+        return matrix @ query
+    
+    def ensure_cache(self):
+        """Make sure the in-memory matrix is current; a no-op when nothing changed since the last load"""
+        with self._cache_lock:
+            self._refresh_cache_if_changed()
+    
+    def _snapshot(self) -> Tuple[np.ndarray, Optional[np.ndarray], List[Tuple[str, str]]]:
+        """
+        Consistent (matrix, int8 matrix, meta) views of the cache for one search
+        
+        A reload swaps in new buffers and a new meta list, and appends only write past the
+        snapshot's row count, so a search never sees rows and names from different loads
+        """
+        with self._cache_lock:
+            self._refresh_cache_if_changed()
+            return self._emb_matrix, self._emb_matrix_i8, self._emb_meta
+    
+    def _refresh_cache_if_changed(self):
+        """Reload the matrix if we enrolled someone or another process (e.g. register.py) wrote to the DB"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._emb_dirty = True
+        if self._emb_dirty:
+            self._load_matrix()
+    
+    @property
+    def _emb_matrix(self) -> np.ndarray:
+        """Live (N, 512) float32 embeddings (a view, no copy)"""
+        return self._emb_buffer[:self._emb_count]
+    
+    @property
+    def _emb_matrix_i8(self) -> Optional[np.ndarray]:
+        """Live (N, 512) int8 embeddings, or None when the int8 pre-filter is off"""
+        if self._emb_buffer_i8 is None:
+            return None
+        return self._emb_buffer_i8[:self._emb_count]
+    
+    def _load_matrix(self):
+        """Read every stored embedding once into a contiguous float32 buffer"""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, description, embedding FROM people").fetchall()
+        
+        capacity = max(config.EMBEDDING_INITIAL_CAPACITY, 2 * len(rows))
+        buffer = np.empty((capacity, config.EMBEDDING_DIM), dtype=np.float32)
+        blobs = [blob for _, _, blob in rows]
+        if all(len(blob) == config.EMBEDDING_DIM * 4 for blob in blobs):
+            # All raw float32: decode the whole table with one frombuffer instead of one per row
+            buffer[:len(rows)] = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(-1, config.EMBEDDING_DIM)
+        else:
+            for i, blob in enumerate(blobs):
+                buffer[i] = convert_array(blob)
+        
+        buffer_i8 = None
+        if config.USE_INT8_SEARCH and SIMSIMD_AVAILABLE:
+            buffer_i8 = np.empty((capacity, config.EMBEDDING_DIM), dtype=np.int8)
+            buffer_i8[:len(rows)] = quantize_int8(buffer[:len(rows)])
+        
+        self._emb_buffer_i8 = buffer_i8
+        self._emb_buffer = buffer
+        self._emb_count = len(rows)
+        self._emb_meta = [(name, description) for name, description, _ in rows]
+        self._emb_dirty = False
+        logger.info(f"Loaded {len(rows)} embedding(s) into memory")
+    
+    def _append_to_cache(self, embedding: np.ndarray, name: str, description: str):
+        """
+        Write a newly enrolled face into the spare capacity instead of reloading the table
+        
+        The caller holds self._cache_lock from before the INSERT, so no reload can pick up
+        the new row in between and have it appended a second time
+        """
+        if self._emb_dirty:
+            return  # Not loaded yet; the next search reads the new row from the DB
+        
+        if self._emb_count == len(self._emb_buffer):
+            self._grow_buffers(max(config.EMBEDDING_INITIAL_CAPACITY, 2 * len(self._emb_buffer)))
+        
+        row = np.asarray(embedding, dtype=np.float32)
+        self._emb_buffer[self._emb_count] = row
+        if self._emb_buffer_i8 is not None:
+            self._emb_buffer_i8[self._emb_count] = quantize_int8(row)
+        self._emb_meta.append((name, description))
+        self._emb_count += 1
+    
+    def _grow_buffers(self, capacity: int):
+        """Reallocate the embedding buffers with room for capacity rows"""
+        buffer = np.empty((capacity, config.EMBEDDING_DIM), dtype=np.float32)
+        buffer[:self._emb_count] = self._emb_matrix
+        self._emb_buffer = buffer
+        
+        if self._emb_buffer_i8 is not None:
+            buffer_i8 = np.empty((capacity, config.EMBEDDING_DIM), dtype=np.int8)
+            buffer_i8[:self._emb_count] = self._emb_matrix_i8
+            self._emb_buffer_i8 = buffer_i8
+    
     def recognize_faces(self, image: np.ndarray, threshold: float = None) -> Dict:
         """
         Recognize all faces in an image
@@ -147,6 +375,23 @@ class FaceMatcher:
         
         # Detect faces
         detected_faces = self.detect_faces(image)
+        return self.match_faces(detected_faces, threshold)
+    
+    def match_faces(self, detected_faces: List[Dict], threshold: float = None) -> Dict:
+        """
+        Match faces returned by detect_faces against the database
+        
+        Split out of recognize_faces so callers can run detection and ensure_cache concurrently
+        
+        Args:
+            detected_faces: Output of detect_faces
+            threshold: Similarity threshold (uses default if None)
+            
+        Returns:
+            Same format as recognize_faces
+        """
+        if threshold is None:
+            threshold = config.DEFAULT_THRESHOLD
         
         if len(detected_faces) == 0:
             return {
@@ -154,11 +399,13 @@ class FaceMatcher:
                 "faces": []
             }
         
-        # Match each detected face
+        # Match every detected face in one matrix product
+        all_matches = self.match_batch(
+            np.stack([face["embedding"] for face in detected_faces]), threshold, top_k=1
+        )
+        
         recognized_faces = []
-        for face in detected_faces:
-            matches = self.find_matches(face["embedding"], threshold)
-            
+        for face, matches in zip(detected_faces, all_matches):
             if matches:
                 # Take the best match
                 best_match = matches[0]
@@ -182,6 +429,25 @@ class FaceMatcher:
             "faces": recognized_faces
         }
     
+    def _best_match(self, embedding: np.ndarray, threshold: float) -> Optional[Dict]:
+        """Highest-scoring cached face at or above threshold, without sorting every match"""
+        try:
+            matrix, matrix_i8, meta = self._snapshot()
+            if len(matrix) == 0:
+                return None
+            
+            idx, scores = self._score_above(embedding, threshold, matrix, matrix_i8)
+            if len(idx) == 0:
+                return None
+            
+            best = int(np.argmax(scores))
+            name, description = meta[idx[best]]
+            return {"name": name, "description": description, "confidence": float(scores[best])}
+            
+        except Exception as e:
+            logger.error(f"Database query failed: {str(e)}")
+            raise FaceMatcherError(f"Database query failed: {str(e)}")
+    
     def check_duplicate(self, embedding: np.ndarray, threshold: float) -> Tuple[bool, Optional[Dict]]:
         """
         Check if a face embedding already exists in database
@@ -195,11 +461,10 @@ class FaceMatcher:
             - is_duplicate: True if duplicate found
             - match_info: Dict with duplicate details if found, else None
         """
-        matches = self.find_matches(embedding, threshold)
+        best_match = self._best_match(embedding, threshold)
         
-        if matches:
+        if best_match:
             # Found a match - consider it a duplicate
-            best_match = matches[0]
             logger.info(f"Duplicate detected: {best_match['name']} (confidence: {best_match['confidence']:.3f})")
             return True, best_match
         
@@ -267,15 +532,16 @@ class FaceMatcher:
         
         # Save to database
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO people (name, description, embedding) VALUES (?, ?, ?)",
-                (name, description, adapt_array(embedding))
-            )
-            person_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            # Insert and append under one cache lock (same order as _snapshot: cache, then connection)
+            with self._cache_lock:
+                with self._lock:
+                    cursor = self._conn.execute(
+                        "INSERT INTO people (name, description, embedding) VALUES (?, ?, ?)",
+                        (name, description, adapt_array(embedding))
+                    )
+                    person_id = cursor.lastrowid
+                    self._conn.commit()
+                self._append_to_cache(embedding, name, description)
             
             logger.info(f"✓ Enrolled {name} with ID {person_id}")
             
@@ -298,16 +564,11 @@ class FaceMatcher:
             Dictionary with database stats
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM people")
-            total_faces = cursor.fetchone()[0]
-            cursor.execute("SELECT name FROM people")
-            names = [row[0] for row in cursor.fetchall()]
-            conn.close()
+            with self._lock:
+                names = [row[0] for row in self._conn.execute("SELECT name FROM people")]
             
             return {
-                "total_faces": total_faces,
+                "total_faces": len(names),
                 "names": names
             }
         except Exception as e:
@@ -322,11 +583,16 @@ class FaceMatcher:
                 return False
             
             # Check database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM people")
-            conn.close()
+            with self._lock:
+                self._conn.execute("SELECT COUNT(*) FROM people")
             
             return True
         except:
             return False
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -2,22 +2,26 @@
 S.A.G.E Face Recognition Service
 FastAPI server for face recognition and enrollment
 """
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import uvicorn
-from datetime import datetime
 
 # Import configurations and models
 import config
 from api_models import (
     RecognizeRequest, RecognizeResponse, FaceMatch,
     EnrollRequest, EnrollResponse,
-    ErrorResponse, HealthResponse
+    ErrorResponse, HealthResponse, utc_now
 )
 from face_matcher import FaceMatcher, FaceMatcherError
-from utils.image_utils import decode_base64_image, validate_image, preprocess_image, ImageProcessingError
+from utils.image_utils import (
+    decode_base64_image, decode_image_bytes, validate_image, preprocess_image, ImageProcessingError,
+    PREPROCESS_MAX_SIZE
+)
 
 # Configure logging
 logging.basicConfig(
@@ -27,33 +31,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title=config.SERVICE_NAME,
-    version=config.SERVICE_VERSION,
-    description="Face recognition and enrollment service for S.A.G.E smartglasses",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict to specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Global face matcher instance
 face_matcher: FaceMatcher = None
 
 
-# ==================== STARTUP/SHUTDOWN EVENTS ====================
+# ==================== STARTUP/SHUTDOWN ====================
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the face matcher on startup"""
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the face matcher on startup and clean up on shutdown"""
     global face_matcher
     try:
         logger.info("=" * 60)
@@ -74,12 +60,33 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to start service: {str(e)}")
         raise
+    
+    yield
+    
+    logger.info("Shutting down Face Recognition Service...")
+    if face_matcher is not None:
+        face_matcher.close()
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down Face Recognition Service...")
+# Initialize FastAPI app
+app = FastAPI(
+    title=config.SERVICE_NAME,
+    version=config.SERVICE_VERSION,
+    description="Face recognition and enrollment service for S.A.G.E smartglasses",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # orjson, with numpy arrays/scalars serialized natively
+    lifespan=lifespan
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, restrict to specific origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 
 # ==================== EXCEPTION HANDLERS ====================
@@ -88,13 +95,12 @@ async def shutdown_event():
 async def image_processing_exception_handler(request: Request, exc: ImageProcessingError):
     """Handle image processing errors"""
     logger.error(f"Image processing error: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content=ErrorResponse(
             error="ImageProcessingError",
-            message=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
+            message=str(exc)
+        ).model_dump(mode="json")
     )
 
 
@@ -102,13 +108,12 @@ async def image_processing_exception_handler(request: Request, exc: ImageProcess
 async def face_matcher_exception_handler(request: Request, exc: FaceMatcherError):
     """Handle face matcher errors"""
     logger.error(f"Face matcher error: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="FaceMatcherError",
-            message=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
+            message=str(exc)
+        ).model_dump(mode="json")
     )
 
 
@@ -116,13 +121,12 @@ async def face_matcher_exception_handler(request: Request, exc: FaceMatcherError
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
     logger.error(f"Unexpected error: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="InternalServerError",
-            message="An unexpected error occurred",
-            timestamp=datetime.utcnow()
-        ).dict()
+            message="An unexpected error occurred"
+        ).model_dump(mode="json")
     )
 
 
@@ -138,6 +142,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "recognize": "/recognize",
+            "recognize_raw": "/recognize/raw",
             "enroll": "/enroll",
             "docs": "/docs"
         }
@@ -155,8 +160,7 @@ async def health_check():
         service=config.SERVICE_NAME,
         version=config.SERVICE_VERSION,
         model_loaded=face_matcher is not None and face_matcher.model is not None,
-        database_connected=is_healthy,
-        timestamp=datetime.utcnow()
+        database_connected=is_healthy
     )
 
 
@@ -174,58 +178,47 @@ async def recognize_faces(request: RecognizeRequest):
     
     try:
         # Decode image
-        image = decode_base64_image(request.image_base64)
+        image = decode_base64_image(request.image_base64, max_size=PREPROCESS_MAX_SIZE)
+        return await recognize_image(image, request.threshold)
         
-        # Validate image
-        is_valid, error_msg = validate_image(image)
-        if not is_valid:
-            raise ImageProcessingError(error_msg)
-        
-        # Preprocess image
-        image = preprocess_image(image)
-        
-        # Recognize faces
-        result = face_matcher.recognize_faces(image, request.threshold)
-        
-        # Build response
-        if result["faces_detected"] == 0:
-            return RecognizeResponse(
-                success=True,
-                message=config.MSG_NO_FACE_DETECTED,
-                faces_detected=0,
-                faces=[],
-                timestamp=datetime.utcnow()
-            )
-        
-        # Convert to FaceMatch objects
-        face_matches = [
-            FaceMatch(
-                name=face["name"],
-                description=face["description"],
-                confidence=face["confidence"],
-                bounding_box=face["bounding_box"]
+    except ImageProcessingError:
+        raise
+    except FaceMatcherError:
+        raise
+    except Exception as e:
+        logger.error(f"Recognition failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/recognize/raw", response_model=RecognizeResponse)
+async def recognize_faces_raw(
+    file: UploadFile = File(..., description="Image file (JPEG, PNG, ...)"),
+    threshold: float = Query(
+        default=config.DEFAULT_THRESHOLD,
+        ge=config.MIN_THRESHOLD,
+        le=config.MAX_THRESHOLD,
+        description="Similarity threshold for face matching (0.3-0.9)"
+    )
+):
+    """
+    Recognize faces in an uploaded image file
+    
+    Same as /recognize, but takes the image as multipart/form-data instead of
+    base64 JSON, so the client skips encoding and the server skips decoding
+    """
+    logger.info(f"POST /recognize/raw - threshold: {threshold}")
+    
+    try:
+        image_bytes = await file.read()
+        if not image_bytes:
+            raise ImageProcessingError("Uploaded file is empty")
+        if len(image_bytes) > config.MAX_IMAGE_SIZE:
+            raise ImageProcessingError(
+                f"Image exceeds the {config.MAX_IMAGE_SIZE // (1024 * 1024)}MB size limit"
             )
-            for face in result["faces"]
-        ]
-        
-        # Count recognized vs unknown faces
-        recognized_count = sum(1 for face in result["faces"] if face["name"] != "Unknown")
         
-        message = config.MSG_RECOGNITION_SUCCESS
-        if recognized_count == 0:
-            message = config.MSG_NO_MATCH
-        elif recognized_count < result["faces_detected"]:
-            message = f"Recognized {recognized_count} of {result['faces_detected']} faces"
-        
-        logger.info(f"✓ Recognized {recognized_count}/{result['faces_detected']} faces")
-        
-        return RecognizeResponse(
-            success=True,
-            message=message,
-            faces_detected=result["faces_detected"],
-            faces=face_matches,
-            timestamp=datetime.utcnow()
-        )
+        image = decode_image_bytes(image_bytes, max_size=PREPROCESS_MAX_SIZE)
+        return await recognize_image(image, threshold)
         
     except ImageProcessingError:
         raise
@@ -236,6 +229,62 @@ async def recognize_faces(request: RecognizeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def recognize_image(image, threshold: float) -> RecognizeResponse:
+    """Validate, preprocess and match a decoded image; shared by both recognize endpoints"""
+    # Validate image
+    is_valid, error_msg = validate_image(image)
+    if not is_valid:
+        raise ImageProcessingError(error_msg)
+    
+    # Preprocess image
+    image = preprocess_image(image)
+    
+    # Detect faces while the embedding cache refreshes, both off the event loop
+    detected_faces, _ = await asyncio.gather(
+        asyncio.to_thread(face_matcher.detect_faces, image),
+        asyncio.to_thread(face_matcher.ensure_cache)
+    )
+    result = await asyncio.to_thread(face_matcher.match_faces, detected_faces, threshold)
+    
+    # Build response
+    if result["faces_detected"] == 0:
+        return RecognizeResponse(
+            success=True,
+            message=config.MSG_NO_FACE_DETECTED,
+            faces_detected=0,
+            faces=[]
+        )
+    
+    # Convert to FaceMatch objects
+    face_matches = [
+        FaceMatch(
+            name=face["name"],
+            description=face["description"],
+            confidence=face["confidence"],
+            bounding_box=face["bounding_box"]
+        )
+        for face in result["faces"]
+    ]
+    
+    # Count recognized vs unknown faces
+    recognized_count = sum(1 for face in result["faces"] if face["name"] != "Unknown")
+    
+    message = config.MSG_RECOGNITION_SUCCESS
+    if recognized_count == 0:
+        message = config.MSG_NO_MATCH
+    elif recognized_count < result["faces_detected"]:
+        message = f"Recognized {recognized_count} of {result['faces_detected']} faces"
+    
+    logger.info(f"✓ Recognized {recognized_count}/{result['faces_detected']} faces")
+    
+    return RecognizeResponse(
+        success=True,
+        message=message,
+        faces_detected=result["faces_detected"],
+        faces=face_matches
+    )
+
+
 @app.post("/enroll", response_model=EnrollResponse)
 async def enroll_face(request: EnrollRequest):
     """
@@ -250,7 +299,7 @@ async def enroll_face(request: EnrollRequest):
     
     try:
         # Decode image
-        image = decode_base64_image(request.image_base64)
+        image = decode_base64_image(request.image_base64, max_size=PREPROCESS_MAX_SIZE)
         
         # Validate image
         is_valid, error_msg = validate_image(image)
@@ -273,8 +322,7 @@ async def enroll_face(request: EnrollRequest):
             logger.warning(f"Enrollment failed: {result['message']}")
             return EnrollResponse(
                 success=False,
-                message=result["message"],
-                timestamp=datetime.utcnow()
+                message=result["message"]
             )
         
         logger.info(f"✓ Enrolled {request.name} (ID: {result['person_id']})")
@@ -284,8 +332,7 @@ async def enroll_face(request: EnrollRequest):
             message=result["message"],
             person_id=result["person_id"],
             name=request.name,
-            confidence=result["confidence"],
-            timestamp=datetime.utcnow()
+            confidence=result["confidence"]
         )
         
     except ImageProcessingError:
@@ -304,7 +351,7 @@ async def get_stats():
     return {
         "total_faces": stats["total_faces"],
         "registered_names": stats["names"],
-        "timestamp": datetime.utcnow()
+        "timestamp": utc_now()
     }
 
 
@@ -316,5 +363,6 @@ if __name__ == "__main__":
         host=config.SERVICE_HOST,
         port=config.SERVICE_PORT,
         reload=False,  # Set to True for development
+        loop="auto",  # uvloop when installed (not available on Windows), else asyncio
         log_level=config.LOG_LEVEL.lower()
     )
@@ -2,18 +2,33 @@ import sqlite3
 import numpy as np
 import io
 
+# Header written by np.save; embeddings stored before the raw float32 format start with it
+NPY_MAGIC = b"\x93NUMPY"
+
 def adapt_array(arr):
-    """Convert numpy array to binary for SQLite."""
-    out = io.BytesIO()
-    np.save(out, arr)
-    out.seek(0)
-    return sqlite3.Binary(out.read())
+    """Convert numpy array to binary for SQLite (raw float32 bytes)."""
+    return sqlite3.Binary(np.ascontiguousarray(arr, dtype=np.float32).tobytes())
 
 def convert_array(blob):
-    """Convert binary back to numpy array."""
-    out = io.BytesIO(blob)
-    out.seek(0)
-    return np.load(out)
+    """Convert binary back to numpy array (read-only view, no copy)."""
+    if blob[:len(NPY_MAGIC)] == NPY_MAGIC:
+        # Legacy np.save blob that init_db hasn't migrated yet
+        return np.load(io.BytesIO(blob)).astype(np.float32, copy=False)
+    return np.frombuffer(blob, dtype=np.float32)
+
+def migrate_legacy_embeddings(conn):
+    """Rewrite np.save blobs as raw float32 bytes. Returns the number of rows migrated."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, embedding FROM people WHERE substr(embedding, 1, ?) = ?",
+        (len(NPY_MAGIC), NPY_MAGIC)
+    )
+    rows = cursor.fetchall()
+    cursor.executemany(
+        "UPDATE people SET embedding = ? WHERE id = ?",
+        [(adapt_array(convert_array(blob)), row_id) for row_id, blob in rows]
+    )
+    return len(rows)
 
 def init_db(db_path):
     conn = sqlite3.connect(db_path)
@@ -26,5 +41,6 @@ def init_db(db_path):
             embedding BLOB NOT NULL
         )
     ''')
+    migrate_legacy_embeddings(conn)
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
@@ -3,6 +3,7 @@ Image utility functions for Face Recognition Service
 Handles base64 decoding and image preprocessing
 """
 import base64
+import struct
 import cv2
 import numpy as np
 from typing import Tuple, Optional
@@ -10,18 +11,41 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    import pybase64  # SIMD (AVX2/NEON) base64 codec, drop-in for the stdlib module
+    b64decode = pybase64.b64decode
+    b64encode = pybase64.b64encode
+except ImportError:
+    b64decode = base64.b64decode
+    b64encode = base64.b64encode
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo_jpeg = TurboJPEG()  # Raises if the libjpeg-turbo shared library isn't installed
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):
+    _turbo_jpeg = None
+    TURBOJPEG_AVAILABLE = False
+
+JPEG_MAGIC = b"\xff\xd8"
+
+PREPROCESS_MAX_SIZE = 1920  # Longest side handed to the face detector
+MIN_IMAGE_DIMENSION = 32  # Smaller images are rejected by validate_image
+MAX_IMAGE_DIMENSION = 4096  # Larger images are rejected by validate_image
+
 
 class ImageProcessingError(Exception):
     """Custom exception for image processing errors"""
     pass
 
 
-def decode_base64_image(base64_string: str) -> np.ndarray:
+def decode_base64_image(base64_string: str, max_size: Optional[int] = None) -> np.ndarray:
     """
     Decode base64 string to OpenCV image (numpy array)
     
     Args:
         base64_string: Base64 encoded image string
+        max_size: See decode_image_bytes
         
     Returns:
         np.ndarray: Decoded image in BGR format (OpenCV format)
@@ -31,28 +55,125 @@ def decode_base64_image(base64_string: str) -> np.ndarray:
     """
     try:
         # Remove data URI prefix if present (e.g., "data:image/jpeg;base64,")
-        if ',' in base64_string:
+        if base64_string[:5] == 'data:':
             base64_string = base64_string.split(',', 1)[1]
         
         # Decode base64 to bytes
-        image_bytes = base64.b64decode(base64_string)
+        image_bytes = b64decode(base64_string, validate=False)
         
-        # Convert bytes to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
+    except base64.binascii.Error as e:
+        raise ImageProcessingError(f"Invalid base64 encoding: {str(e)}")
+    except Exception as e:
+        raise ImageProcessingError(f"Failed to decode image: {str(e)}")
+    
+    return decode_image_bytes(image_bytes, max_size)
+
+
+def decode_image_bytes(image_bytes: bytes, max_size: Optional[int] = None) -> np.ndarray:
+    """
+    Decode raw encoded image bytes (JPEG, PNG, ...) to OpenCV image
+    
+    Args:
+        image_bytes: Encoded image file contents
+        max_size: If set, large JPEGs may be decoded at 1/2, 1/4 or 1/8 scale, never
+            below max_size on the longer side; preprocess_image does the exact resize
         
-        # Decode to OpenCV image
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    Returns:
+        np.ndarray: Decoded image in BGR format (OpenCV format)
         
+    Raises:
+        ImageProcessingError: If decoding fails
+    """
+    image = None
+    if TURBOJPEG_AVAILABLE and image_bytes[:2] == JPEG_MAGIC:
+        try:
+            # libjpeg-turbo straight to BGR; typically 2-3x faster than cv2.imdecode
+            scaling_factor = _jpeg_scaling_factor(image_bytes, max_size) if max_size else None
+            image = _turbo_jpeg.decode(image_bytes, pixel_format=TJPF_BGR, scaling_factor=scaling_factor)
+            # TurboJPEG ignores EXIF Orientation; cv2.imdecode applies it, so match that
+            image = _apply_exif_orientation(image, _jpeg_orientation(image_bytes))
+        except Exception as e:
+            logger.debug(f"TurboJPEG decode failed, falling back to OpenCV: {str(e)}")
+    
+    try:
         if image is None:
-            raise ImageProcessingError("Failed to decode image. Invalid image format.")
+            # Convert bytes to numpy array
+            nparr = np.frombuffer(image_bytes, np.uint8)
+            
+            # Decode to OpenCV image (PNG, BMP, ... and JPEGs TurboJPEG couldn't handle)
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
-        logger.info(f"Successfully decoded image with shape: {image.shape}")
-        return image
-        
-    except base64.binascii.Error as e:
-        raise ImageProcessingError(f"Invalid base64 encoding: {str(e)}")
     except Exception as e:
         raise ImageProcessingError(f"Failed to decode image: {str(e)}")
+    
+    if image is None:
+        raise ImageProcessingError("Failed to decode image. Invalid image format.")
+    
+    logger.info(f"Successfully decoded image with shape: {image.shape}")
+    return image
+
+
+def _jpeg_orientation(image_bytes: bytes) -> int:
+    """EXIF Orientation tag (1-8) of a JPEG, 1 when absent or unreadable"""
+    try:
+        i = 2
+        while i + 4 <= len(image_bytes) and image_bytes[i] == 0xFF:
+            marker = image_bytes[i + 1]
+            if marker in (0xD9, 0xDA):  # End of image / start of scan: no more metadata
+                break
+            length = struct.unpack(">H", image_bytes[i + 2:i + 4])[0]
+            if marker == 0xE1 and image_bytes[i + 4:i + 10] == b"Exif\x00\x00":
+                tiff = i + 10
+                endian = "<" if image_bytes[tiff:tiff + 2] == b"II" else ">"
+                ifd = tiff + struct.unpack(endian + "I", image_bytes[tiff + 4:tiff + 8])[0]
+                entries = struct.unpack(endian + "H", image_bytes[ifd:ifd + 2])[0]
+                for entry in range(ifd + 2, ifd + 2 + 12 * entries, 12):
+                    if struct.unpack(endian + "H", image_bytes[entry:entry + 2])[0] == 0x0112:
+                        orientation = struct.unpack(endian + "H", image_bytes[entry + 8:entry + 10])[0]
+                        return orientation if 1 <= orientation <= 8 else 1
+                return 1
+            i += 2 + length
+    except struct.error:
+        pass
+    return 1
+
+
+def _apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+    """Rotate/flip a decoded image upright the way cv2.imdecode does for EXIF Orientation"""
+    if orientation == 2:
+        return cv2.flip(image, 1)
+    if orientation == 3:
+        return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(image, 0)
+    if orientation == 5:
+        return cv2.transpose(image)
+    if orientation == 6:
+        return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8:
+        return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
+
+def _jpeg_scaling_factor(image_bytes: bytes, max_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Coarsest DCT-domain scale that keeps the longer side at or above max_size
+    and the shorter side at or above MIN_IMAGE_DIMENSION
+    
+    Returns None (decode at full size) when no reduction fits, or when the image is over
+    MAX_IMAGE_DIMENSION so validate_image still sees, and rejects, its real size
+    """
+    width, height, _, _ = _turbo_jpeg.decode_header(image_bytes)
+    longest, shortest = max(width, height), min(width, height)
+    if longest > MAX_IMAGE_DIMENSION:
+        return None
+    for denominator in (8, 4, 2):
+        # Elongated images mustn't shrink below the minimum validate_image enforces
+        if longest // denominator >= max_size and shortest // denominator >= MIN_IMAGE_DIMENSION:
+            return (1, denominator)
+    return None
 
 
 def encode_image_to_base64(image: np.ndarray, format: str = '.jpg') -> str:
@@ -70,14 +191,18 @@ def encode_image_to_base64(image: np.ndarray, format: str = '.jpg') -> str:
         ImageProcessingError: If encoding fails
     """
     try:
-        # Encode image to specified format
-        success, buffer = cv2.imencode(format, image)
-        
-        if not success:
-            raise ImageProcessingError(f"Failed to encode image to {format}")
+        if TURBOJPEG_AVAILABLE and format.lower() in ('.jpg', '.jpeg'):
+            # libjpeg-turbo straight from BGR, same default quality as cv2.imencode
+            buffer = _turbo_jpeg.encode(image, quality=95, pixel_format=TJPF_BGR)
+        else:
+            # Encode image to specified format
+            success, buffer = cv2.imencode(format, image)
+            
+            if not success:
+                raise ImageProcessingError(f"Failed to encode image to {format}")
         
         # Convert to base64
-        base64_string = base64.b64encode(buffer).decode('utf-8')
+        base64_string = b64encode(buffer).decode('utf-8')
         
         return base64_string
         
@@ -98,10 +223,12 @@ def validate_image(image: np.ndarray) -> Tuple[bool, Optional[str]]:
     if image is None:
         return False, "Image is None"
     
-    if not isinstance(image, np.ndarray):
+    try:
+        ndim = image.ndim
+    except AttributeError:
         return False, "Image must be a numpy array"
     
-    if len(image.shape) != 3:
+    if ndim != 3:
         return False, f"Invalid image dimensions: {image.shape}. Expected 3D array (H, W, C)"
     
     height, width, channels = image.shape
@@ -109,16 +236,16 @@ def validate_image(image: np.ndarray) -> Tuple[bool, Optional[str]]:
     if channels != 3:
         return False, f"Invalid number of channels: {channels}. Expected 3 (BGR)"
     
-    if height < 32 or width < 32:
-        return False, f"Image too small: {width}x{height}. Minimum size is 32x32"
-    
-    if height > 4096 or width > 4096:
-        return False, f"Image too large: {width}x{height}. Maximum size is 4096x4096"
+    # Common case: one chained comparison per side
+    if MIN_IMAGE_DIMENSION <= height <= MAX_IMAGE_DIMENSION and MIN_IMAGE_DIMENSION <= width <= MAX_IMAGE_DIMENSION:
+        return True, None
     
-    return True, None
+    if height < MIN_IMAGE_DIMENSION or width < MIN_IMAGE_DIMENSION:
+        return False, f"Image too small: {width}x{height}. Minimum size is {MIN_IMAGE_DIMENSION}x{MIN_IMAGE_DIMENSION}"
+    return False, f"Image too large: {width}x{height}. Maximum size is {MAX_IMAGE_DIMENSION}x{MAX_IMAGE_DIMENSION}"
 
 
-def preprocess_image(image: np.ndarray, max_size: int = 1920) -> np.ndarray:
+def preprocess_image(image: np.ndarray, max_size: int = PREPROCESS_MAX_SIZE) -> np.ndarray:
     """
     Preprocess image for face detection
     Resizes large images while maintaining aspect ratio
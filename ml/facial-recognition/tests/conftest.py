@@ -0,0 +1,7 @@
+"""Pytest configuration."""
+import sys
+from pathlib import Path
+
+# The service modules import each other from src/ (e.g. `import config`)
+src_dir = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_dir))
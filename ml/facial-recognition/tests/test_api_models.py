@@ -0,0 +1,41 @@
+"""Tests for the base64 image payload check."""
+import base64
+
+import pytest
+
+from api_models import validate_image_base64
+
+PAYLOAD = base64.b64encode(bytes(range(256)) * 4).decode()
+
+
+def test_accepts_plain_base64():
+    assert validate_image_base64(PAYLOAD) == PAYLOAD
+
+
+def test_accepts_line_wrapped_base64():
+    """MIME / `base64` CLI output wraps lines; the whitespace is stripped"""
+    wrapped = "\n".join(PAYLOAD[i:i + 76] for i in range(0, len(PAYLOAD), 76))
+    assert validate_image_base64(wrapped + "\r\n") == PAYLOAD
+
+
+@pytest.mark.parametrize("media_type", ["image/jpeg", "application/octet-stream", ""])
+def test_accepts_any_data_uri_media_type(media_type):
+    uri = f"data:{media_type};base64,{PAYLOAD}"
+    assert validate_image_base64(uri) == uri
+
+
+@pytest.mark.parametrize("value", ["", "  \n "])
+def test_rejects_empty(value):
+    with pytest.raises(ValueError, match="empty"):
+        validate_image_base64(value)
+
+
+@pytest.mark.parametrize("value", [
+    PAYLOAD[:-1],  # Length not a multiple of 4
+    "abc!" + PAYLOAD[4:],  # Outside the base64 alphabet
+    "ab=c" + PAYLOAD[4:],  # Padding before the end
+    "data:image/png," + PAYLOAD,  # Data URI without ;base64
+])
+def test_rejects_malformed(value):
+    with pytest.raises(ValueError, match="not valid base64"):
+        validate_image_base64(value)
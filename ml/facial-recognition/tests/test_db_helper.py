@@ -0,0 +1,56 @@
+"""Tests for embedding storage and the legacy np.save migration."""
+import io
+import sqlite3
+
+import numpy as np
+
+from utils.db_helper import NPY_MAGIC, init_db, migrate_legacy_embeddings
+
+
+def npy_blob(arr):
+    """Embedding blob in the old np.save format"""
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def stored_blobs(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT embedding FROM people ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_init_db_migrates_legacy_blobs_losslessly(tmp_path):
+    """init_db rewrites np.save blobs as raw float32 with the exact same values, once"""
+    db_path = tmp_path / "face_data.db"
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((3, 512)).astype(np.float32)
+
+    # Create the table first so it holds legacy rows before init_db ever runs
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO people (name, description, embedding) VALUES (?, ?, ?)",
+        [(f"person{i}", "test", npy_blob(emb)) for i, emb in enumerate(embeddings)]
+    )
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+
+    migrated = stored_blobs(db_path)
+    for (blob,), emb in zip(migrated, embeddings):
+        assert not blob.startswith(NPY_MAGIC)
+        assert len(blob) == emb.nbytes
+        assert np.array_equal(np.frombuffer(blob, dtype=np.float32), emb)
+
+    # A second run finds nothing left to migrate and leaves the bytes alone
+    conn = sqlite3.connect(db_path)
+    try:
+        assert migrate_legacy_embeddings(conn) == 0
+    finally:
+        conn.close()
+    init_db(db_path)
+    assert stored_blobs(db_path) == migrated
@@ -0,0 +1,45 @@
+"""Tests for the EXIF orientation parser used on the TurboJPEG path."""
+import struct
+
+from utils.image_utils import _jpeg_orientation
+
+SOI = b"\xff\xd8"
+SOS = b"\xff\xda\x00\x02"
+
+
+def exif_jpeg(orientation, endian):
+    """JPEG header with an APP1 Exif segment holding only the Orientation tag"""
+    order = b"II" if endian == "<" else b"MM"
+    tiff = (
+        order + struct.pack(endian + "HI", 42, 8)  # TIFF header, IFD0 right after it
+        + struct.pack(endian + "H", 1)  # One IFD entry
+        + struct.pack(endian + "HHIHH", 0x0112, 3, 1, orientation, 0)  # Orientation, SHORT
+        + struct.pack(endian + "I", 0)  # No next IFD
+    )
+    payload = b"Exif\x00\x00" + tiff
+    return SOI + b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload + SOS
+
+
+def test_orientation_little_endian():
+    assert _jpeg_orientation(exif_jpeg(6, "<")) == 6
+
+
+def test_orientation_big_endian():
+    assert _jpeg_orientation(exif_jpeg(8, ">")) == 8
+
+
+def test_orientation_defaults_without_exif():
+    """A JFIF-only header has no orientation"""
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    jpeg = SOI + b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0 + SOS
+    assert _jpeg_orientation(jpeg) == 1
+
+
+def test_orientation_defaults_on_truncated_exif():
+    """A header cut off inside the Exif segment falls back to 1 instead of raising"""
+    jpeg = exif_jpeg(6, "<")
+    assert _jpeg_orientation(jpeg[:24]) == 1
+
+
+def test_orientation_ignores_out_of_range_values():
+    assert _jpeg_orientation(exif_jpeg(9, "<")) == 1
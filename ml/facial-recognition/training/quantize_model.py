@@ -0,0 +1,145 @@
+import os
+import shutil
+import time
+import cv2
+import numpy as np
+import onnxruntime
+from insightface.app import FaceAnalysis
+from insightface.model_zoo import get_model
+from insightface.utils import face_align
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+# Creates the "buffalo_l_int8" model pack: buffalo_l with the recognition model
+# (w600k_r50.onnx) statically quantized to int8 (QDQ, per-channel weights), calibrated
+# on aligned face crops from data/faces_db. Only set INSIGHTFACE_MODEL = "buffalo_l_int8"
+# in src/config.py if validate() reports it as both faster and within tolerance.
+# On GPU, the fp16 TensorRT provider in config.PROVIDERS is the faster option.
+
+# 1. Setup paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+img_folder = os.path.join(script_dir, "..", "data", "faces_db")  # Calibration images
+models_root = os.path.join(os.path.expanduser("~"), ".insightface", "models")
+src_dir = os.path.join(models_root, "buffalo_l")
+dst_dir = os.path.join(models_root, "buffalo_l_int8")
+REC_MODEL = "w600k_r50.onnx"
+
+# Largest allowed change of any pairwise cosine similarity on the calibration set.
+# Matches sit well above config.DEFAULT_THRESHOLD, so a few hundredths don't flip them
+MAX_SIMILARITY_SHIFT = 0.03
+
+# Timed single-face inferences per model (after one warm-up run)
+BENCH_RUNS = 50
+
+# 2. Initialize Model (also downloads buffalo_l if it isn't there yet)
+app = FaceAnalysis(name='buffalo_l', providers=['CPUExecutionProvider'])
+app.prepare(ctx_id=0, det_size=(640, 640))
+
+# Recognition model, only used for its input name, size and normalization
+rec = get_model(os.path.join(src_dir, REC_MODEL), providers=['CPUExecutionProvider'])
+rec.prepare(ctx_id=-1)
+
+
+def aligned_crops():
+    """112x112 aligned crop of the first face in every calibration image"""
+    crops = []
+    for filename in sorted(os.listdir(img_folder)):
+        img = cv2.imread(os.path.join(img_folder, filename))
+        faces = app.get(img) if img is not None else []
+        if faces:
+            crops.append(face_align.norm_crop(img, landmark=faces[0].kps, image_size=rec.input_size[0]))
+    return crops
+
+
+def to_blob(crops):
+    """Preprocess crops the same way ArcFaceONNX.get_feat does"""
+    return cv2.dnn.blobFromImages(
+        crops, 1.0 / rec.input_std, rec.input_size,
+        (rec.input_mean, rec.input_mean, rec.input_mean), swapRB=True
+    )
+
+
+class FaceCropReader(CalibrationDataReader):
+    """Feeds the aligned crops to the calibrator one face at a time"""
+
+    def __init__(self, crops):
+        self.crops = crops
+        self.rewind()
+
+    def get_next(self):
+        crop = next(self._iter, None)
+        return None if crop is None else {rec.input_name: to_blob([crop])}
+
+    def rewind(self):
+        self._iter = iter(self.crops)
+
+
+def build_int8_pack(crops):
+    os.makedirs(dst_dir, exist_ok=True)
+    for filename in os.listdir(src_dir):
+        if filename.endswith(".onnx") and filename != REC_MODEL:
+            shutil.copy2(os.path.join(src_dir, filename), dst_dir)
+
+    quantize_static(
+        os.path.join(src_dir, REC_MODEL),
+        os.path.join(dst_dir, REC_MODEL),
+        FaceCropReader(crops),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8
+    )
+    print(f"✅ Wrote {dst_dir}")
+
+
+def embeddings(session, crops):
+    """L2-normalized embeddings of the crops from the given recognition session"""
+    feats = session.run(None, {rec.input_name: to_blob(crops)})[0]
+    return feats / np.linalg.norm(feats, axis=1, keepdims=True)
+
+
+def latency_ms(session, crop):
+    """Mean single-face inference time"""
+    feed = {rec.input_name: to_blob([crop])}
+    session.run(None, feed)
+    start = time.perf_counter()
+    for _ in range(BENCH_RUNS):
+        session.run(None, feed)
+    return (time.perf_counter() - start) * 1000 / BENCH_RUNS
+
+
+def validate(crops):
+    int8_path = os.path.join(dst_dir, REC_MODEL)
+    try:
+        # Make sure the quantized graph loads on the provider it was built for
+        int8_session = onnxruntime.InferenceSession(int8_path, providers=['CPUExecutionProvider'])
+    except Exception as e:
+        print(f"❌ {int8_path} doesn't load on CPUExecutionProvider: {e}; keep using buffalo_l")
+        return
+    fp32_session = onnxruntime.InferenceSession(
+        os.path.join(src_dir, REC_MODEL), providers=['CPUExecutionProvider']
+    )
+
+    fp32 = embeddings(fp32_session, crops)
+    int8 = embeddings(int8_session, crops)
+    shift = np.abs(fp32 @ fp32.T - int8 @ int8.T).max()
+
+    fp32_ms = latency_ms(fp32_session, crops[0])
+    int8_ms = latency_ms(int8_session, crops[0])
+    print(f"Max similarity shift {shift:.4f} over {len(crops)} faces")
+    print(f"Latency fp32 {fp32_ms:.1f} ms, int8 {int8_ms:.1f} ms ({fp32_ms / int8_ms:.2f}x)")
+
+    if shift > MAX_SIMILARITY_SHIFT:
+        print(f"❌ Similarity shift exceeds {MAX_SIMILARITY_SHIFT}; keep using buffalo_l")
+    elif int8_ms >= fp32_ms:
+        print("❌ int8 is not faster on this CPU; keep using buffalo_l")
+    else:
+        print('✅ Set INSIGHTFACE_MODEL = "buffalo_l_int8" in src/config.py')
+
+
+if __name__ == "__main__":
+    crops = aligned_crops()
+    if not crops:
+        print(f"❌ No faces found in {img_folder}; need calibration images to quantize")
+    else:
+        build_int8_pack(crops)
+        validate(crops)
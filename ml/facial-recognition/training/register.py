@@ -1,8 +1,10 @@
 import os
 import cv2
 import sqlite3
+import onnxruntime
 from insightface.app import FaceAnalysis
 import sys
+from concurrent.futures import ThreadPoolExecutor
 # Add parent dir to path so we can import utils
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.utils.db_helper import adapt_array, init_db
@@ -13,35 +15,73 @@ db_path = os.path.join(script_dir, "..", "src", "models", "face_data.db")
 img_folder = os.path.join(script_dir, "..", "data", "faces_db")
 
 # 2. Initialize Model
-app = FaceAnalysis(name='buffalo_l', providers=['CPUExecutionProvider'])
+# GPU when this onnxruntime build has CUDA, otherwise CPU
+providers = ['CPUExecutionProvider']
+if 'CUDAExecutionProvider' in onnxruntime.get_available_providers():
+    providers.insert(0, 'CUDAExecutionProvider')
+app = FaceAnalysis(name='buffalo_l', providers=providers)
 app.prepare(ctx_id=0, det_size=(640, 640))
 init_db(db_path)
 
-def register_person(name, description, filename):
+# Threads for reading images; inference stays on one thread because ONNX Runtime
+# already spreads each call over all cores
+READ_WORKERS = 4
+
+def read_image(filename):
+    """img_folder/filename as a BGR array, or None"""
     img_path = os.path.join(img_folder, filename)
     img = cv2.imread(img_path)
-    
     if img is None:
         print(f"❌ Error: Could not find or read {img_path}")
-        return
+    return img
+
+def detect_embedding(filename, img):
+    """Normalized embedding of the first face in img, or None"""
+    if img is None:
+        return None
 
     faces = app.get(img)
-    if faces:
-        emb = faces[0].normed_embedding
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO people (name, description, embedding) VALUES (?, ?, ?)",
-            (name, description, adapt_array(emb))
-        )
+    if not faces:
+        print(f"⚠️ No face detected in {filename}")
+        return None
+    return faces[0].normed_embedding
+
+def register_people(people):
+    """Register [(name, description, filename), ...] with one connection and one commit"""
+    filenames = [filename for _, _, filename in people]
+    # imread releases the GIL, so later images are decoded while earlier ones are detected
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+        embs = [
+            detect_embedding(filename, img)
+            for filename, img in zip(filenames, pool.map(read_image, filenames))
+        ]
+
+    rows = [
+        (name, description, adapt_array(emb))
+        for (name, description, _), emb in zip(people, embs)
+        if emb is not None
+    ]
+    if not rows:
+        return
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL") # Same mode as the face service, so it can keep reading
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executemany("INSERT INTO people (name, description, embedding) VALUES (?, ?, ?)", rows)
         conn.commit()
+    finally:
         conn.close()
+    for name, _, _ in rows:
         print(f"✅ Successfully registered {name}!")
-    else:
-        print(f"⚠️ No face detected in {filename}")
+
+def register_person(name, description, filename):
+    register_people([(name, description, filename)])
 
 if __name__ == "__main__":
     # Example usage
-    register_person("Navaneet", "Team Member for SAGE Project", "Navaneet.jpg")
-    register_person("Ananya", "Team Member for SAGE Project", "Ananya.jpg")
-    register_person("Gayathri", "Team Member for SAGE Project", "Gayathri.jpg")
\ No newline at end of file
+    register_people([
+        ("Navaneet", "Team Member for SAGE Project", "Navaneet.jpg"),
+        ("Ananya", "Team Member for SAGE Project", "Ananya.jpg"),
+        ("Gayathri", "Team Member for SAGE Project", "Gayathri.jpg"),
+    ])
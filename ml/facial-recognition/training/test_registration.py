@@ -1,60 +1,267 @@
 import sqlite3
 import cv2
 import numpy as np
+import onnxruntime
 import os
+import queue
+import threading
 from insightface.app import FaceAnalysis
+from insightface.utils import face_align
 from utils.db_helper import convert_array
 
+try:
+    import simsimd # int8 SIMD dot products; NumPy has no fast fp16/int8 matmul on CPU
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    import faiss # Approximate nearest-neighbour index for large galleries
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
 # Setup
 script_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(script_dir, "models", "face_data.db")
 
-app = FaceAnalysis(name='buffalo_l', providers=['CPUExecutionProvider'])
+# GPU when this onnxruntime build has CUDA, otherwise CPU
+providers = ['CPUExecutionProvider']
+if 'CUDAExecutionProvider' in onnxruntime.get_available_providers():
+    providers.insert(0, 'CUDAExecutionProvider')
+
+# Webcam faces are large relative to the frame, so the lightweight buffalo_sc detector (SCRFD-500MF)
+# at 320x320 is enough here. Recognition must stay buffalo_l: register.py enrolls with its
+# ResNet50 model and buffalo_sc's MobileFaceNet embeddings aren't comparable to those.
+DETECTION_SIZE = (320, 320)
+det_app = FaceAnalysis(name='buffalo_sc', allowed_modules=['detection'], providers=providers)
+det_app.prepare(ctx_id=0, det_size=DETECTION_SIZE)
+detector = det_app.det_model
+
+# Only detection + recognition; landmark/gender-age models would run per face for nothing
+app = FaceAnalysis(name='buffalo_l', allowed_modules=['detection', 'recognition'], providers=providers)
 app.prepare(ctx_id=0, det_size=(640, 640))
+recognizer = app.models['recognition'] # ArcFaceONNX
+
+# Warm up both models so the first webcam frame doesn't pay for session/CUDA initialization
+for _ in range(2):
+    detector.detect(np.zeros((*DETECTION_SIZE[::-1], 3), dtype=np.uint8), max_num=0, metric='default')
+    recognizer.get_feat([np.zeros((112, 112, 3), dtype=np.uint8)])
+
+MATCH_THRESHOLD = 0.45
+RELOAD_POLL_SECONDS = 1.0 # How often to check whether someone was registered meanwhile
+HNSW_MIN_GALLERY = 5000 # Below this a linear scan is as fast as an HNSW search
+HNSW_NEIGHBORS = 32
+HNSW_EF_SEARCH = 64 # Candidates explored per query; higher = better recall, slower
+
+def quantize_int8(embs):
+    """Unit-norm embeddings (values in [-1, 1]) -> int8, a quarter of the float32 size"""
+    return np.ascontiguousarray(np.round(embs * 127), dtype=np.int8)
+
+def load_all():
+    """
+    Read every stored face once: gallery, names, descriptions
+
+    The gallery is a FAISS HNSW index for large galleries (when faiss is installed),
+    otherwise an (N, 512) matrix, int8 when simsimd is installed
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT name, description, embedding FROM people").fetchall()
+    finally:
+        conn.close()
+    E = np.array([convert_array(blob) for _, _, blob in rows], dtype=np.float32).reshape(-1, 512)
+    if FAISS_AVAILABLE and len(E) >= HNSW_MIN_GALLERY:
+        index = faiss.IndexHNSWFlat(512, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT) # Inner product = cosine here
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        index.add(E)
+        E = index
+    elif SIMSIMD_AVAILABLE:
+        E = quantize_int8(E)
+    return E, [row[0] for row in rows], [row[1] for row in rows]
+
+def db_mtime():
+    """Last write to the DB; WAL-mode writers only touch the -wal file until a checkpoint"""
+    paths = (db_path, db_path + "-wal")
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0.0)
+
+# Decoded once here instead of per face, per frame; swapped whole by watch_db
+known_faces = load_all()
+
+def watch_db(stop):
+    """Reload known_faces whenever the DB changes on disk (e.g. register.py ran)"""
+    global known_faces
+    last_mtime = db_mtime()
+    while not stop.wait(RELOAD_POLL_SECONDS):
+        mtime = db_mtime()
+        if mtime != last_mtime:
+            last_mtime = mtime
+            known_faces = load_all()
+            print(f"Reloaded {len(known_faces[1])} known face(s)")
+
+def detect_faces(frame):
+    """(K, 4) face boxes and (K, 5, 2) landmarks"""
+    bboxes, kpss = detector.detect(frame, max_num=0, metric='default')
+    return bboxes[:, :4], kpss
+
+# Recognition input/output live in these buffers for the whole session and are bound to it once per
+# batch size via IOBinding, instead of ORT allocating fresh tensors for every call
+MAX_BATCH = 16
+rec_input = np.empty((MAX_BATCH, 3, *recognizer.input_size[::-1]), dtype=np.float32)
+rec_output = np.empty((MAX_BATCH, 512), dtype=np.float32)
+rec_binding = recognizer.session.io_binding()
+
+def run_recognizer(crops):
+    """Same as recognizer.get_feat(crops), run through the preallocated buffers"""
+    embs = np.empty((len(crops), 512), dtype=np.float32)
+    for start in range(0, len(crops), MAX_BATCH):
+        batch = crops[start:start + MAX_BATCH]
+        k = len(batch)
+        rec_input[:k] = cv2.dnn.blobFromImages(
+            batch, 1.0 / recognizer.input_std, recognizer.input_size,
+            (recognizer.input_mean,) * 3, swapRB=True
+        )
+        rec_binding.bind_input(recognizer.input_name, 'cpu', 0, np.float32, (k, *rec_input.shape[1:]), rec_input.ctypes.data)
+        rec_binding.bind_output(recognizer.output_names[0], 'cpu', 0, np.float32, (k, 512), rec_output.ctypes.data)
+        recognizer.session.run_with_iobinding(rec_binding)
+        embs[start:start + k] = rec_output[:k]
+    return embs
+
+def embed_faces(frame, kpss):
+    """Embed the faces at the given landmarks in one batched recognition pass: (K, 512) unit embeddings"""
+    if len(kpss) == 0:
+        return np.empty((0, 512), dtype=np.float32)
+
+    crops = [face_align.norm_crop(frame, landmark=kps, image_size=recognizer.input_size[0]) for kps in kpss]
+    embs = run_recognizer(crops) # (K, 3, 112, 112) blob through the session once, not once per face
+    embs /= np.linalg.norm(embs, axis=1, keepdims=True) # Same as face.normed_embedding
+    return embs
+
+def similarities(embs, E):
+    """(K, N) cosine similarities between the frame's faces and the gallery"""
+    if len(embs) == 0 or len(E) == 0:
+        return np.zeros((len(embs), len(E)), dtype=np.float32)
+    if E.dtype == np.int8:
+        return 1.0 - np.asarray(simsimd.cdist(quantize_int8(embs), E, metric="cosine"))
+    return embs @ E.T # Embeddings are unit-norm
+
+def box_iou(a, b):
+    """(len(a), len(b)) IoU between two sets of [x1, y1, x2, y2] boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+def best_matches(embs, gallery):
+    """Best similarity and gallery row for each embedding"""
+    if isinstance(gallery, np.ndarray):
+        sims = similarities(embs, gallery)
+        best = sims.argmax(axis=1)
+        return sims[np.arange(len(sims)), best], best
+    D, I = gallery.search(np.ascontiguousarray(embs, dtype=np.float32), 1)
+    return D[:, 0], I[:, 0]
+
+def recognize(embs):
+    """(name, description, similarity) for each embedding"""
+    E, names, descs = known_faces
+    if not names or len(embs) == 0:
+        return [("Unknown", "", 0.0)] * len(embs)
+
+    labels = []
+    for sim, i in zip(*best_matches(embs, E)):
+        if sim > MATCH_THRESHOLD:
+            labels.append((names[i], descs[i], float(sim)))
+        else:
+            labels.append(("Unknown", "", 0.0))
+    return labels
+
+# A detection overlapping a tracked face by more than TRACK_IOU reuses its label instead of
+# running recognition; tracked faces are still re-recognized every TRACK_REFRESH_FRAMES
+TRACK_IOU = 0.6
+TRACK_REFRESH_FRAMES = 15
+TRACK_MAX_AGE = 5 # Frames a track survives without a matching detection
+
+def capture_frames(cap, frames, stop):
+    """Read the webcam at its own pace, keeping only the newest frame (None once the camera stops)"""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            frame = None
+        if frames.full():
+            try:
+                frames.get_nowait() # Drop the frame inference didn't get to
+            except queue.Empty:
+                pass
+        frames.put(frame)
+        if frame is None:
+            break
 
 def recognize_live():
+    stop = threading.Event()
+    threading.Thread(target=watch_db, args=(stop,), daemon=True).start()
+
     cap = cv2.VideoCapture(0) # Open Webcam
+    frames = queue.Queue(maxsize=1)
+    capture = threading.Thread(target=capture_frames, args=(cap, frames, stop), daemon=True)
+    capture.start()
     print("Webcam active. Press 'q' to exit.")
 
+    # Each track: {"bbox", "label": (name, desc, sim), "seen": frame, "recognized": frame}
+    tracks = []
+    frame_idx = 0
+
     while True:
-        ret, frame = cap.read()
-        if not ret: break
+        frame = frames.get()
+        if frame is None: break
+        frame_idx += 1
         
-        faces = app.get(frame)
-        for face in faces:
-            detected_emb = face.normed_embedding
-            
-            # Search Database
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name, description, embedding FROM people")
-            
-            match_name = "Unknown"
-            match_desc = ""
-            max_sim = 0.0
-            
-            for name, desc, emb_blob in cursor.fetchall():
-                known_emb = convert_array(emb_blob)
-                sim = np.dot(detected_emb, known_emb) # Cosine similarity
-                
-                if sim > 0.45 and sim > max_sim: # Threshold check
-                    max_sim = sim
-                    match_name = name
-                    match_desc = desc
+        bboxes, kpss = detect_faces(frame)
+        ious = box_iou(bboxes, np.array([t["bbox"] for t in tracks]).reshape(-1, 4))
+        
+        # Match detections to tracks; only unmatched or stale ones go through recognition
+        frame_tracks = []
+        need = []
+        for d in range(len(bboxes)):
+            t = int(ious[d].argmax()) if tracks else -1
+            if t >= 0 and ious[d, t] > TRACK_IOU:
+                track = tracks[t]
+                ious[:, t] = 0 # One detection per track
+                track["bbox"], track["seen"] = bboxes[d], frame_idx
+                if frame_idx - track["recognized"] >= TRACK_REFRESH_FRAMES:
+                    need.append(track)
+            else:
+                track = {"bbox": bboxes[d], "label": None, "seen": frame_idx, "recognized": frame_idx}
+                tracks.append(track)
+                need.append(track)
+            track["kps"] = kpss[d]
+            frame_tracks.append(track)
+        
+        for track, label in zip(need, recognize(embed_faces(frame, [t["kps"] for t in need]))):
+            track["label"], track["recognized"] = label, frame_idx
+            if label[0] != "Unknown":
+                print(f"Found {label[0]}: {label[1]}")
+        
+        tracks = [t for t in tracks if frame_idx - t["seen"] <= TRACK_MAX_AGE]
+        
+        for track in frame_tracks:
+            match_name, _, max_sim = track["label"]
             
             # Draw results on screen
-            x1, y1, x2, y2 = face.bbox.astype(int)
+            x1, y1, x2, y2 = track["bbox"].astype(int)
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
             cv2.putText(frame, f"{match_name} ({max_sim:.2f})", (x1, y1-10), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-            
-            if match_name != "Unknown":
-                print(f"Found {match_name}: {match_desc}")
 
         cv2.imshow("SAGE Recognition", frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+    stop.set()
+    capture.join() # Don't release the camera under a pending cap.read()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -8,12 +8,23 @@ import json
 import logging
 import subprocess
 import sys
+import threading
 import time
 import dbus
 import dbus.service
 import dbus.mainloop.glib
 from gi.repository import GLib
 
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps_bytes = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps_bytes(obj):
+        return json.dumps(obj).encode()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -58,6 +69,11 @@ class FailedException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.bluez.Error.Failed'
 
 
+def json_to_dbus(obj):
+    """Serialize obj as JSON into a DBus byte array ('ay')"""
+    return dbus.Array(json_dumps_bytes(obj), signature='y')
+
+
 class Application(dbus.service.Object):
     """DBus Application for GATT services"""
     
@@ -216,14 +232,13 @@ class CredentialsCharacteristic(Characteristic):
     def WriteValue(self, value, options):
         """Called when mobile app writes WiFi credentials"""
         try:
-            # Convert DBus bytes to string
+            # Convert DBus bytes to bytes
             data_bytes = bytes(value)
-            data_str = data_bytes.decode('utf-8')
             
-            logger.info(f'!!! WriteValue CALLED - Received credentials data: {len(data_str)} bytes')
+            logger.info(f'!!! WriteValue CALLED - Received credentials data: {len(data_bytes)} bytes')
             
             # Parse JSON
-            credentials = json.loads(data_str)
+            credentials = json_loads(data_bytes)
             ssid = credentials.get('ssid')
             password = credentials.get('password')
             
@@ -244,9 +259,9 @@ class CredentialsCharacteristic(Characteristic):
                 logger.warning(f'!!! BLOCKED - Already connected to {ssid}, ignoring duplicate request')
                 return
             
-            logger.info(f'!!! QUEUING connection to {ssid} via GLib.idle_add')
-            # Connect to WiFi (async)
-            GLib.idle_add(self.wifi_manager.connect_to_wifi, ssid, password)
+            logger.info(f'!!! STARTING connection to {ssid} in background thread')
+            # Connect off the main loop so GATT reads/notifications keep working
+            self.wifi_manager.connect_in_background(ssid, password)
             
         except json.JSONDecodeError as e:
             logger.error(f'Invalid JSON: {e}')
@@ -279,8 +294,7 @@ class StatusCharacteristic(Characteristic):
             'ssid': self.wifi_manager.ssid
         }
         
-        status_json = json.dumps(status_data)
-        return dbus.Array([dbus.Byte(c) for c in status_json.encode()])
+        return json_to_dbus(status_data)
 
     def StartNotify(self):
         """Enable notifications"""
@@ -308,8 +322,7 @@ class StatusCharacteristic(Characteristic):
             'ssid': self.wifi_manager.ssid
         }
         
-        status_json = json.dumps(status_data)
-        value = dbus.Array([dbus.Byte(c) for c in status_json.encode()])
+        value = json_to_dbus(status_data)
         self.PropertiesChanged(GATT_CHRC_IFACE, {'Value': value}, [])
         logger.info(f'Sent status notification: {status}')
 
@@ -331,9 +344,8 @@ class WiFiScanCharacteristic(Characteristic):
         networks = self.wifi_manager.scan_networks()
         
         # Return as JSON array
-        networks_json = json.dumps(networks)
         logger.info(f'Returning {len(networks)} networks')
-        return dbus.Array([dbus.Byte(c) for c in networks_json.encode()])
+        return json_to_dbus(networks)
 
 
 class NetworkDetailsCharacteristic(Characteristic):
@@ -353,7 +365,7 @@ class NetworkDetailsCharacteristic(Characteristic):
             current_network = self.wifi_manager.get_current_network()
             
             if not current_network:
-                return dbus.Array([dbus.Byte(c) for c in json.dumps({
+                return json_to_dbus({
                     'rssi': None,
                     'frequency': None,
                     'protocol': None,
@@ -361,7 +373,7 @@ class NetworkDetailsCharacteristic(Characteristic):
                     'link_speed': None,
                     'channel': None,
                     'noise': None
-                }).encode()])
+                })
             
             # Get detailed WiFi info using iw and ip commands
             details = {}
@@ -441,11 +453,11 @@ class NetworkDetailsCharacteristic(Characteristic):
             if 'noise' not in details:
                 details['noise'] = '-90'
             
-            return dbus.Array([dbus.Byte(c) for c in json.dumps(details).encode()])
+            return json_to_dbus(details)
             
         except Exception as e:
             logger.error(f'Error getting network details: {e}')
-            return dbus.Array([dbus.Byte(c) for c in json.dumps({}).encode()])
+            return json_to_dbus({})
 
 
 class BluetoothDetailsCharacteristic(Characteristic):
@@ -485,11 +497,11 @@ class BluetoothDetailsCharacteristic(Characteristic):
             except:
                 pass
             
-            return dbus.Array([dbus.Byte(c) for c in json.dumps(details).encode()])
+            return json_to_dbus(details)
             
         except Exception as e:
             logger.error(f'Error getting Bluetooth details: {e}')
-            return dbus.Array([dbus.Byte(c) for c in json.dumps({}).encode()])
+            return json_to_dbus({})
 
 
 class DeviceInfoCharacteristic(Characteristic):
@@ -525,11 +537,11 @@ class DeviceInfoCharacteristic(Characteristic):
                 # If no file, use current time
                 details['paired_timestamp'] = datetime.datetime.now().isoformat()
             
-            return dbus.Array([dbus.Byte(c) for c in json.dumps(details).encode()])
+            return json_to_dbus(details)
             
         except Exception as e:
             logger.error(f'Error getting device info: {e}')
-            return dbus.Array([dbus.Byte(c) for c in json.dumps({}).encode()])
+            return json_to_dbus({})
 
 
 class SAGEGattService(Service):
@@ -616,6 +628,7 @@ class WiFiManager:
         self.last_attempt_ssid = None  # Track last connection attempt
         self.last_attempt_time = 0  # Track last connection attempt time
         self.cooldown_seconds = 45  # Cooldown period between connection attempts
+        self.connect_lock = threading.Lock()  # Held by the background connect thread
 
     def set_status_callback(self, callback):
         """Set callback for status updates"""
@@ -716,11 +729,31 @@ class WiFiManager:
             return None
 
     def update_status(self, new_status):
-        """Update status and notify"""
+        """Update status and notify (notification is sent from the GLib main loop)"""
         self.status = new_status
         logger.info(f'WiFi status: {new_status}')
         if self.status_callback:
-            self.status_callback(new_status)
+            GLib.idle_add(self._notify_status, new_status)
+
+    def _notify_status(self, status):
+        """Idle callback; returns False so it runs only once"""
+        self.status_callback(status)
+        return False
+
+    def connect_in_background(self, ssid, password):
+        """Run connect_to_wifi in a worker thread so the BLE main loop is never blocked"""
+        if not self.connect_lock.acquire(blocking=False):
+            logger.warning('Connection already in progress, ignoring duplicate request')
+            return False
+
+        def worker():
+            try:
+                self.connect_to_wifi(ssid, password)
+            finally:
+                self.connect_lock.release()
+
+        threading.Thread(target=worker, name='wifi-connect', daemon=True).start()
+        return True
 
     def connect_to_wifi(self, ssid, password):
         """Connect to WiFi hotspot using bash script for reliable switching"""
@@ -785,8 +818,12 @@ class WiFiManager:
             
             # Check result - but ALSO verify actual connection regardless of exit code
             # (script might exit 1 due to timing but still be connected)
-            time.sleep(2)  # Give a moment for network to stabilize
-            actual_network = self.get_current_network()
+            # Wait (up to 2s) until we are associated with the requested network
+            for _ in range(20):
+                actual_network = self.get_current_network()
+                if actual_network == ssid:
+                    break
+                time.sleep(0.1)
             
             if actual_network == ssid:
                 logger.info(f'Successfully connected to WiFi: {ssid} (verified)')